@@ -1,45 +1,93 @@
 import redis.asyncio as redis
-import json
-import pickle
-from typing import Any, Optional
+import asyncio
+import msgspec
+import time
+import orjson
+from cachetools import TLRUCache
+from typing import Any, Dict, List, Optional, Sequence
 from datetime import datetime, timedelta
+from uuid import UUID
 import logging
+from redis.exceptions import RedisError
 
 from app.core.config import get_settings
 
 settings = get_settings()
 logger = logging.getLogger(__name__)
 
+def _enc_hook(obj: Any) -> Any:
+    """Encode types msgpack does not support natively"""
+    if hasattr(obj, "model_dump"):
+        # Pydantic models
+        return obj.model_dump()
+    if hasattr(obj, "tolist"):
+        # NumPy arrays and scalars
+        return obj.tolist()
+    raise NotImplementedError(f"Cannot encode objects of type {type(obj)}")
+
+# msgpack codecs for binary cache values
+_encoder = msgspec.msgpack.Encoder(enc_hook=_enc_hook)
+_decoder = msgspec.msgpack.Decoder()
+
+# Failures a cache operation can hit: Redis/network errors plus
+# (de)serialization errors. Anything else is a bug and should propagate.
+_WRITE_ERRORS = (RedisError, TypeError)
+_READ_ERRORS = (RedisError, ValueError, msgspec.DecodeError)
+
+def _l1_ttu(key: str, entry: tuple, now: float) -> float:
+    """Expire an L1 entry (value, ttl seconds) when its Redis copy would"""
+    return now + entry[1]
+
 class RedisCache:
     """Redis cache manager"""
     
+    # Upper bound on in-flight fire-and-forget writes
+    MAX_PENDING_WRITES = 1024
+    # How long shutdown waits for in-flight writes before abandoning them
+    DRAIN_TIMEOUT_SECONDS = 5.0
+    
+    # Key prefixes whose raw bytes are also kept in the in-process L1 cache.
+    # Each entry lives no longer than the key's remaining Redis TTL (and at
+    # most L1_MAX_TTL_SECONDS), so L1 never serves a value Redis has already
+    # expired, e.g. a model performance summary past its 60s TTL.
+    L1_KEY_PREFIXES = ("prediction:", "model_performance:")
+    L1_MAX_TTL_SECONDS = 300
+    
     def __init__(self):
-        self.redis_client = None
+        # Bounded pool so sockets are reused and capped under load. No
+        # connection is opened until the first command, so a missing Redis
+        # surfaces as RedisError from each operation rather than None access.
+        self.connection_pool = redis.ConnectionPool(
+            host=settings.REDIS_HOST,
+            port=settings.REDIS_PORT,
+            db=settings.REDIS_DB,
+            password=settings.REDIS_PASSWORD,
+            max_connections=settings.REDIS_MAX_CONNECTIONS,
+            decode_responses=False,  # We'll handle encoding ourselves
+            socket_connect_timeout=5,
+            socket_keepalive=True,
+            socket_keepalive_options={},
+            health_check_interval=30,
+        )
+        self.redis_client = redis.Redis(connection_pool=self.connection_pool)
+        self._pending_writes = set()
+        # (raw value, ttl seconds) pairs, shared by get() and get_bytes()
+        self._l1 = TLRUCache(maxsize=10_000, ttu=_l1_ttu, timer=time.monotonic)
     
     async def connect(self):
         """Connect to Redis"""
         try:
-            self.redis_client = redis.Redis(
-                host=settings.REDIS_HOST,
-                port=settings.REDIS_PORT,
-                db=settings.REDIS_DB,
-                password=settings.REDIS_PASSWORD,
-                decode_responses=False,  # We'll handle encoding ourselves
-                socket_connect_timeout=5,
-                socket_keepalive=True,
-                socket_keepalive_options={},
-                health_check_interval=30,
-            )
             await self.redis_client.ping()
             logger.info("Connected to Redis")
-        except Exception as e:
-            logger.error(f"Failed to connect to Redis: {e}")
+        except RedisError:
+            logger.exception("Failed to connect to Redis")
             raise
     
     async def disconnect(self):
         """Disconnect from Redis"""
-        if self.redis_client:
-            await self.redis_client.close()
+        # The client does not own a pool passed in explicitly; close both
+        await self.redis_client.aclose()
+        await self.connection_pool.disconnect()
     
     async def set(self, key: str, value: Any, ttl: Optional[int] = None) -> bool:
         """Set a value in cache"""
@@ -48,43 +96,124 @@ class RedisCache:
                 ttl = settings.CACHE_TTL_SECONDS
             
             # Serialize the value
-            serialized_value = pickle.dumps(value)
+            serialized_value = _encoder.encode(value)
             
             # Set with TTL
             await self.redis_client.setex(key, ttl, serialized_value)
+            self._l1_update(key, serialized_value, ttl)
             return True
-        except Exception as e:
-            logger.error(f"Error setting cache key {key}: {e}")
+        except _WRITE_ERRORS:
+            self._l1_update(key, None)
+            logger.exception("Error setting cache key %s", key)
             return False
     
+    def _l1_update(self, key: str, value: Optional[bytes], ttl: Optional[float] = None):
+        """
+        Refresh a key's L1 entry for ttl seconds, or drop it when value is None
+        
+        Every write path calls this once its Redis write has finished, so
+        a read racing the write cannot repopulate L1 with the old value
+        after the update.
+        """
+        if not key.startswith(self.L1_KEY_PREFIXES):
+            return
+        if value is None or ttl is None or ttl <= 0:
+            self._l1.pop(key, None)
+        else:
+            self._l1[key] = (value, min(ttl, self.L1_MAX_TTL_SECONDS))
+    
+    def _schedule_write(self, coro) -> bool:
+        """Run a cache write in the background without awaiting it"""
+        if len(self._pending_writes) >= self.MAX_PENDING_WRITES:
+            # Cache writes are best effort; shed load instead of queueing
+            coro.close()
+            logger.warning("Dropping cache write: too many pending writes")
+            return False
+        
+        task = asyncio.create_task(coro)
+        self._pending_writes.add(task)
+        task.add_done_callback(self._pending_writes.discard)
+        return True
+    
+    async def drain(self, timeout: float = DRAIN_TIMEOUT_SECONDS):
+        """Wait for in-flight background writes, cancelling any still running after timeout"""
+        if not self._pending_writes:
+            return
+        _, pending = await asyncio.wait(set(self._pending_writes), timeout=timeout)
+        if pending:
+            logger.warning("Abandoning %s cache writes still pending at shutdown", len(pending))
+            for task in pending:
+                task.cancel()
+    
     async def get(self, key: str) -> Optional[Any]:
-        """Get a value from cache"""
+        """Get a value from cache, or None if the key is missing"""
+        value = await self.get_bytes(key)
+        if value is None:
+            return None
+        
         try:
-            value = await self.redis_client.get(key)
-            if value is None:
-                return None
-            
             # Deserialize the value
-            return pickle.loads(value)
-        except Exception as e:
-            logger.error(f"Error getting cache key {key}: {e}")
+            return _decoder.decode(value)
+        except _READ_ERRORS:
+            logger.exception("Error decoding cache key %s", key)
             return None
     
+    async def mget(self, keys: List[str]) -> List[Optional[Any]]:
+        """Get multiple values from cache in a single round trip (None for missing keys)"""
+        if not keys:
+            return []
+        try:
+            values = await self.redis_client.mget(keys)
+            return [_decoder.decode(value) if value is not None else None for value in values]
+        except _READ_ERRORS:
+            logger.exception("Error getting %s cache keys", len(keys))
+            return [None] * len(keys)
+    
+    async def mset(self, items: Dict[str, Any], ttl: Optional[int] = None) -> bool:
+        """Set multiple values in cache in a single round trip"""
+        if not items:
+            return True
+        try:
+            if ttl is None:
+                ttl = settings.CACHE_TTL_SECONDS
+            
+            serialized_items = {key: _encoder.encode(value) for key, value in items.items()}
+            async with self.redis_client.pipeline(transaction=False) as pipe:
+                for key, serialized_value in serialized_items.items():
+                    pipe.setex(key, ttl, serialized_value)
+                await pipe.execute()
+            for key, serialized_value in serialized_items.items():
+                self._l1_update(key, serialized_value, ttl)
+            return True
+        except _WRITE_ERRORS:
+            for key in items:
+                self._l1_update(key, None)
+            logger.exception("Error setting %s cache keys", len(items))
+            return False
+    
     async def delete(self, key: str) -> bool:
         """Delete a key from cache"""
         try:
             deleted = await self.redis_client.delete(key)
             return deleted > 0
-        except Exception as e:
-            logger.error(f"Error deleting cache key {key}: {e}")
+        except RedisError:
+            logger.exception("Error deleting cache key %s", key)
             return False
+        finally:
+            self._l1_update(key, None)
     
     async def exists(self, key: str) -> bool:
-        """Check if key exists in cache"""
+        """
+        Check if key exists in cache
+        
+        Only use this when the value is not needed: get() already returns
+        None for missing keys, so exists() followed by get() costs an extra
+        round trip. Use mget() to look up several keys at once.
+        """
         try:
             return await self.redis_client.exists(key) > 0
-        except Exception as e:
-            logger.error(f"Error checking cache key {key}: {e}")
+        except RedisError:
+            logger.exception("Error checking cache key %s", key)
             return False
     
     async def set_json(self, key: str, value: dict, ttl: Optional[int] = None) -> bool:
@@ -93,14 +222,18 @@ class RedisCache:
             if ttl is None:
                 ttl = settings.CACHE_TTL_SECONDS
             
-            # Serialize as JSON
-            json_value = json.dumps(value, default=str)
+            # Serialize as JSON (orjson returns bytes, which Redis accepts as-is)
+            json_value = orjson.dumps(
+                value,
+                default=str,
+                option=orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_SERIALIZE_UUID
+            )
             
             # Set with TTL
             await self.redis_client.setex(key, ttl, json_value)
             return True
-        except Exception as e:
-            logger.error(f"Error setting JSON cache key {key}: {e}")
+        except _WRITE_ERRORS:
+            logger.exception("Error setting JSON cache key %s", key)
             return False
     
     async def get_json(self, key: str) -> Optional[dict]:
@@ -111,48 +244,123 @@ class RedisCache:
                 return None
             
             # Deserialize from JSON
-            return json.loads(value)
-        except Exception as e:
-            logger.error(f"Error getting JSON cache key {key}: {e}")
+            return orjson.loads(value)
+        except _READ_ERRORS:
+            logger.exception("Error getting JSON cache key %s", key)
+            return None
+    
+    async def set_bytes(self, key: str, value: bytes, ttl: Optional[int] = None) -> bool:
+        """Set an already-serialized value in cache"""
+        try:
+            if ttl is None:
+                ttl = settings.CACHE_TTL_SECONDS
+            
+            await self.redis_client.setex(key, ttl, value)
+            self._l1_update(key, value, ttl)
+            return True
+        except RedisError:
+            self._l1_update(key, None)
+            logger.exception("Error setting bytes cache key %s", key)
+            return False
+    
+    def set_bytes_nowait(self, key: str, value: bytes, ttl: Optional[int] = None) -> bool:
+        """Schedule a bytes cache set without waiting for Redis"""
+        return self._schedule_write(self.set_bytes(key, value, ttl))
+    
+    async def get_bytes(self, key: str) -> Optional[bytes]:
+        """Get a raw value from cache without deserializing it"""
+        use_l1 = key.startswith(self.L1_KEY_PREFIXES)
+        if use_l1:
+            entry = self._l1.get(key)
+            if entry is not None:
+                return entry[0]
+        
+        try:
+            if not use_l1:
+                return await self.redis_client.get(key)
+            
+            # Fetch the remaining TTL with the value so the L1 copy expires with it
+            async with self.redis_client.pipeline(transaction=False) as pipe:
+                pipe.get(key)
+                pipe.pttl(key)
+                value, pttl = await pipe.execute()
+            if value is not None:
+                # PTTL is -1 for keys without an expiry
+                ttl = self.L1_MAX_TTL_SECONDS if pttl == -1 else pttl / 1000
+                self._l1_update(key, value, ttl)
+            return value
+        except RedisError:
+            logger.exception("Error getting bytes cache key %s", key)
             return None
     
+    async def set_bytes_with_event(
+        self,
+        key: str,
+        value: bytes,
+        stream: str,
+        fields: dict,
+        delete_keys: Sequence[str] = (),
+        ttl: Optional[int] = None,
+        maxlen: Optional[int] = None
+    ) -> bool:
+        """Set a raw value, delete stale keys and append a stream event in one round trip"""
+        try:
+            if ttl is None:
+                ttl = settings.CACHE_TTL_SECONDS
+            
+            async with self.redis_client.pipeline(transaction=False) as pipe:
+                pipe.setex(key, ttl, value)
+                if delete_keys:
+                    pipe.delete(*delete_keys)
+                pipe.xadd(stream, fields, maxlen=maxlen, approximate=True)
+                await pipe.execute()
+            self._l1_update(key, value, ttl)
+            return True
+        except RedisError:
+            self._l1_update(key, None)
+            logger.exception("Error setting bytes cache key %s with event on %s", key, stream)
+            return False
+        finally:
+            for stale_key in delete_keys:
+                self._l1_update(stale_key, None)
+    
+    def set_bytes_with_event_nowait(self, *args, **kwargs) -> bool:
+        """Schedule set_bytes_with_event without waiting for Redis"""
+        return self._schedule_write(self.set_bytes_with_event(*args, **kwargs))
+    
     async def increment(self, key: str, amount: int = 1) -> int:
         """Increment a counter in cache"""
         try:
             return await self.redis_client.incrby(key, amount)
-        except Exception as e:
-            logger.error(f"Error incrementing cache key {key}: {e}")
+        except RedisError:
+            logger.exception("Error incrementing cache key %s", key)
             return 0
     
     async def set_hash(self, key: str, mapping: dict, ttl: Optional[int] = None) -> bool:
-        """Set a hash in cache"""
+        """Set a mapping in cache as a single msgpack value"""
         try:
-            # Convert all values to strings
-            str_mapping = {k: str(v) for k, v in mapping.items()}
-            
-            await self.redis_client.hmset(key, str_mapping)
-            
-            if ttl:
-                await self.redis_client.expire(key, ttl)
+            # One msgpack blob instead of a Redis hash: no per-field overhead
+            # in Redis and no per-value string conversion
+            serialized_value = _encoder.encode(mapping)
             
+            # SET with EX writes the value and its TTL in a single command
+            await self.redis_client.set(key, serialized_value, ex=ttl or None)
             return True
-        except Exception as e:
-            logger.error(f"Error setting hash cache key {key}: {e}")
+        except _WRITE_ERRORS:
+            logger.exception("Error setting hash cache key %s", key)
             return False
     
     async def get_hash(self, key: str) -> Optional[dict]:
-        """Get a hash from cache"""
+        """Get a mapping stored with set_hash from cache"""
         try:
-            value = await self.redis_client.hgetall(key)
-            if not value:
+            value = await self.redis_client.get(key)
+            if value is None:
                 return None
             
-            # Convert bytes keys/values to strings
-            return {k.decode() if isinstance(k, bytes) else k: 
-                   v.decode() if isinstance(v, bytes) else v 
-                   for k, v in value.items()}
-        except Exception as e:
-            logger.error(f"Error getting hash cache key {key}: {e}")
+            # Deserialize the mapping
+            return _decoder.decode(value) or None
+        except _READ_ERRORS:
+            logger.exception("Error getting hash cache key %s", key)
             return None
 
 # Global cache instance
@@ -166,14 +374,28 @@ def cache_key(*parts: str) -> str:
     """Generate a cache key from parts"""
     return ":".join(str(part) for part in parts)
 
-def prediction_cache_key(patient_id: str, features_hash: str) -> str:
+def prediction_cache_key(
+    patient_id: UUID,
+    model_name: str,
+    model_version: Optional[str],
+    features_hash: str,
+    include_feature_importance: bool
+) -> str:
     """Generate cache key for prediction"""
-    return cache_key("prediction", patient_id, features_hash)
+    # UUID.hex skips the dashed string formatting done by str(UUID)
+    return (
+        f"prediction:{patient_id.hex}:{model_name}:{model_version}:"
+        f"{features_hash}:{int(include_feature_importance)}"
+    )
+
+def prediction_result_cache_key(model_name: str, features_hash: str, include_feature_importance: bool) -> str:
+    """Generate cache key for a raw model prediction result"""
+    return f"prediction_result:{model_name}:{features_hash}:{int(include_feature_importance)}"
 
 def model_performance_cache_key(model_name: str) -> str:
     """Generate cache key for model performance"""
-    return cache_key("model_performance", model_name)
+    return f"model_performance:{model_name}"
 
-def patient_history_cache_key(patient_id: str) -> str:
+def patient_history_cache_key(patient_id: UUID) -> str:
     """Generate cache key for patient history"""
-    return cache_key("patient_history", patient_id)
\ No newline at end of file
+    return f"patient_history:{patient_id.hex}"
\ No newline at end of file
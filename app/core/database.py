@@ -2,16 +2,40 @@ from sqlalchemy import create_engine, MetaData
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
 from sqlalchemy.orm import sessionmaker
+import orjson
 from app.core.config import get_settings
 
 settings = get_settings()
 
-# Create async engine
+def _json_default(obj):
+    """Serialize Pydantic models stored in JSON columns"""
+    if hasattr(obj, "model_dump"):
+        return obj.model_dump()
+    raise TypeError(f"Type is not JSON serializable: {type(obj).__name__}")
+
+def json_serializer(value) -> str:
+    """Serialize JSON column values with orjson"""
+    return orjson.dumps(value, default=_json_default, option=orjson.OPT_SERIALIZE_NUMPY).decode()
+
+# Create async engine. JSON columns are (de)serialized with orjson here; the
+# asyncpg dialect already registers binary json/jsonb codecs that pass these
+# strings through untouched, so no extra asyncpg type codec is needed (one
+# would double-encode the values SQLAlchemy has already serialized).
+engine_options = {}
+if settings.DATABASE_URL.startswith("postgresql+asyncpg"):
+    # Server-side JIT only adds planning latency for these small queries
+    engine_options["connect_args"] = {"server_settings": {"jit": "off"}}
+
 engine = create_async_engine(
     settings.DATABASE_URL,
     echo=settings.DEBUG,
+    pool_size=settings.DB_POOL_SIZE,
+    max_overflow=settings.DB_MAX_OVERFLOW,
     pool_pre_ping=True,
     pool_recycle=3600,
+    json_serializer=json_serializer,
+    json_deserializer=orjson.loads,
+    **engine_options
 )
 
 # Create async session factory
@@ -0,0 +1,23 @@
+from typing import Any
+
+import orjson
+from fastapi.responses import JSONResponse
+
+
+def orjson_dumps(content: Any) -> bytes:
+    """Serialize content to JSON bytes with the API's orjson options"""
+    return orjson.dumps(
+        content,
+        default=str,
+        option=orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_SERIALIZE_UUID | orjson.OPT_NAIVE_UTC
+    )
+
+
+class ORJSONResponse(JSONResponse):
+    """JSON response rendered with orjson"""
+    
+    media_type = "application/json"
+    
+    def render(self, content: Any) -> bytes:
+        """Serialize content to JSON bytes"""
+        return orjson_dumps(content)
@@ -1,18 +1,19 @@
-from fastapi import FastAPI, HTTPException, Depends, BackgroundTasks
+from fastapi import FastAPI, HTTPException, Depends, BackgroundTasks, Response
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.middleware.gzip import GZipMiddleware
 from contextlib import asynccontextmanager
-import redis.asyncio as redis
-from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession
-from sqlalchemy.orm import sessionmaker
 import logging
 import asyncio
+import orjson
 from datetime import datetime
+from sqlalchemy import text
 
 from app.core.config import get_settings
-from app.core.database import Base, get_db
-from app.core.cache import get_redis_client
+from app.core.database import Base, engine, get_db
+from app.core.cache import cache, get_redis_client
+from app.core.orjson_response import ORJSONResponse
 from app.services.ml_service import MLService
+from app.services.prediction_events import PredictionEventConsumer
 from app.routers import predictions
 
 # Configure logging
@@ -21,20 +22,30 @@ logger = logging.getLogger(__name__)
 
 settings = get_settings()
 
-# Database engine
-engine = create_async_engine(
-    settings.DATABASE_URL,
-    echo=settings.DEBUG,
-    pool_pre_ping=True,
-    pool_recycle=3600,
-)
-
-async_session = sessionmaker(
-    engine, class_=AsyncSession, expire_on_commit=False
-)
+# Static response bodies serialized once at import time
+_ROOT_BYTES = orjson.dumps({
+    "message": "Hospital Readmission Prediction API",
+    "version": "1.0.0",
+    "docs": "/docs"
+})
+# Health payload without its closing brace; the timestamp is appended per request
+_HEALTH_PREFIX = orjson.dumps({
+    "status": "healthy",
+    "service": "hospital-readmission-prediction"
+})[:-1] + b',"timestamp":"'
 
-# Redis client
-redis_client = None
+async def warmup(app: FastAPI):
+    """Take model first calls and database connects out of the request path"""
+    ml_service = getattr(app.state, "ml_service", None)
+    if ml_service is not None:
+        await ml_service.warmup()
+    
+    async def open_connection():
+        async with engine.connect() as conn:
+            await conn.execute(text("SELECT 1"))
+    
+    # Hold pool_size connections at once so all of them get established
+    await asyncio.gather(*(open_connection() for _ in range(settings.DB_POOL_SIZE)))
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
@@ -42,21 +53,12 @@ async def lifespan(app: FastAPI):
     # Startup
     logger.info("Starting hospital readmission prediction service")
     
-    # Initialize Redis
-    global redis_client
-    redis_client = redis.Redis(
-        host=settings.REDIS_HOST,
-        port=settings.REDIS_PORT,
-        db=settings.REDIS_DB,
-        decode_responses=True
-    )
-    
-    # Test Redis connection
+    # Connect the shared Redis cache
     try:
-        await redis_client.ping()
-        logger.info("Connected to Redis")
-    except Exception as e:
-        logger.error(f"Failed to connect to Redis: {e}")
+        await cache.connect()
+    except Exception:
+        # RedisCache.connect already logged the failure
+        logger.warning("Continuing without Redis cache")
     
     # Create database tables
     try:
@@ -75,22 +77,49 @@ async def lifespan(app: FastAPI):
     except Exception as e:
         logger.error(f"Failed to initialize ML service: {e}")
     
+    # Warm up models and the database pool (each worker warms itself)
+    if settings.WARMUP:
+        try:
+            await warmup(app)
+            logger.info("Warm-up complete")
+        except Exception as e:
+            logger.error(f"Warm-up failed: {e}")
+    
+    # Apply post-prediction events (performance metrics)
+    event_consumer_task = asyncio.create_task(PredictionEventConsumer(cache).run())
+    
     yield
     
     # Shutdown
     logger.info("Shutting down hospital readmission prediction service")
-    if redis_client:
-        await redis_client.close()
+    event_consumer_task.cancel()
+    try:
+        await event_consumer_task
+    except asyncio.CancelledError:
+        pass
+    # Let fire-and-forget writes (cached responses, history DELs, events)
+    # finish before the pool closes under them
+    await cache.drain()
+    await cache.disconnect()
     await engine.dispose()
 
 app = FastAPI(
     title="Hospital Readmission Prediction API",
     description="ML-powered API for predicting hospital readmissions",
     version="1.0.0",
-    lifespan=lifespan
+    lifespan=lifespan,
+    default_response_class=ORJSONResponse,
+    # Production workers can skip building and holding the OpenAPI schema
+    openapi_url=None if settings.DISABLE_DOCS else "/openapi.json",
+    docs_url=None if settings.DISABLE_DOCS else "/docs",
+    redoc_url=None if settings.DISABLE_DOCS else "/redoc"
 )
 
-# Middleware
+# Middleware (the last one added is outermost)
+# Only compress large bodies, at the fastest level: orjson output is already compact
+app.add_middleware(GZipMiddleware, minimum_size=4096, compresslevel=1)
+
+# CORS wraps GZip so preflight requests are answered before compression
 app.add_middleware(
     CORSMiddleware,
     allow_origins=settings.ALLOWED_ORIGINS,
@@ -99,30 +128,23 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-app.add_middleware(GZipMiddleware, minimum_size=1000)
-
 # Health check endpoint
 @app.get("/health")
 async def health_check():
     """Health check endpoint"""
-    return {
-        "status": "healthy",
-        "timestamp": datetime.utcnow().isoformat(),
-        "service": "hospital-readmission-prediction"
-    }
+    content = _HEALTH_PREFIX + datetime.utcnow().isoformat().encode() + b'"}'
+    return Response(content=content, media_type="application/json")
 
 # Include routers
 app.include_router(predictions.router, prefix="/api/v1")
+app.add_exception_handler(HTTPException, predictions.http_exception_handler)
+app.add_exception_handler(Exception, predictions.general_exception_handler)
 
 # Root endpoint
 @app.get("/")
 async def root():
     """Root endpoint"""
-    return {
-        "message": "Hospital Readmission Prediction API",
-        "version": "1.0.0",
-        "docs": "/docs"
-    }
+    return Response(content=_ROOT_BYTES, media_type="application/json")
 
 if __name__ == "__main__":
     import uvicorn
@@ -131,5 +153,7 @@ if __name__ == "__main__":
         host="0.0.0.0",
         port=8000,
         reload=settings.DEBUG,
-        log_level="info"
+        log_level="info",
+        loop="uvloop",
+        http="httptools"
     )
\ No newline at end of file
@@ -1,5 +1,4 @@
-from sqlalchemy import Column, String, Float, DateTime, Text, Integer, Boolean, JSON, ForeignKey
-from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy import Column, String, Float, DateTime, Text, Integer, Boolean, JSON, ForeignKey, Index, Uuid
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 import uuid
@@ -12,8 +11,9 @@ class Prediction(Base):
     
     __tablename__ = "predictions"
     
-    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
-    patient_id = Column(UUID(as_uuid=True), nullable=False, index=True)
+    id = Column(Uuid, primary_key=True, default=uuid.uuid4)
+    patient_id = Column(Uuid, nullable=False)  # Indexed by ix_predictions_patient_created
+    batch_id = Column(String(100), ForeignKey("batch_predictions.batch_id"), nullable=True, index=True)
     model_name = Column(String(100), nullable=False)
     model_version = Column(String(50), nullable=False)
     risk_score = Column(Float, nullable=False)
@@ -28,16 +28,24 @@ class Prediction(Base):
     updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
     
     # Relationships
-    model_performance = relationship("ModelPerformance", back_populates="predictions")
     batch_predictions = relationship("BatchPrediction", back_populates="predictions")
 
 
+# Serves patient history lookups (filter by patient, newest first) in index
+# order, so the LIMIT/OFFSET page needs no sort
+Index(
+    "ix_predictions_patient_created",
+    Prediction.patient_id,
+    Prediction.created_at.desc()
+)
+
+
 class ModelPerformance(Base):
     """Model performance metrics"""
     
     __tablename__ = "model_performance"
     
-    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    id = Column(Uuid, primary_key=True, default=uuid.uuid4)
     model_name = Column(String(100), nullable=False)
     model_version = Column(String(50), nullable=False)
     accuracy = Column(Float, nullable=True)
@@ -52,9 +60,6 @@ class ModelPerformance(Base):
     evaluation_date = Column(DateTime(timezone=True), server_default=func.now())
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
-    
-    # Relationships
-    predictions = relationship("Prediction", back_populates="model_performance")
 
 
 class BatchPrediction(Base):
@@ -62,7 +67,7 @@ class BatchPrediction(Base):
     
     __tablename__ = "batch_predictions"
     
-    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    id = Column(Uuid, primary_key=True, default=uuid.uuid4)
     batch_id = Column(String(100), nullable=False, unique=True)
     status = Column(String(20), nullable=False, default="pending")  # pending, processing, completed, failed
     total_records = Column(Integer, nullable=False)
@@ -85,9 +90,9 @@ class PredictionAudit(Base):
     
     __tablename__ = "prediction_audit"
     
-    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
-    prediction_id = Column(UUID(as_uuid=True), ForeignKey("predictions.id"), nullable=False)
-    user_id = Column(UUID(as_uuid=True), nullable=True)
+    id = Column(Uuid, primary_key=True, default=uuid.uuid4)
+    prediction_id = Column(Uuid, ForeignKey("predictions.id"), nullable=False)
+    user_id = Column(Uuid, nullable=True)
     action = Column(String(50), nullable=False)  # created, viewed, updated, deleted
     ip_address = Column(String(45), nullable=True)
     user_agent = Column(String(500), nullable=True)
@@ -100,7 +105,7 @@ class ModelRegistry(Base):
     
     __tablename__ = "model_registry"
     
-    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    id = Column(Uuid, primary_key=True, default=uuid.uuid4)
     name = Column(String(100), nullable=False, unique=True)
     version = Column(String(50), nullable=False)
     description = Column(Text, nullable=True)
@@ -122,12 +127,12 @@ class PredictionFeedback(Base):
     
     __tablename__ = "prediction_feedback"
     
-    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
-    prediction_id = Column(UUID(as_uuid=True), ForeignKey("predictions.id"), nullable=False)
+    id = Column(Uuid, primary_key=True, default=uuid.uuid4)
+    prediction_id = Column(Uuid, ForeignKey("predictions.id"), nullable=False)
     actual_outcome = Column(Boolean, nullable=True)  # True if readmitted, False if not
     feedback_score = Column(Integer, nullable=True)  # 1-5 rating
     feedback_text = Column(Text, nullable=True)
-    provided_by = Column(UUID(as_uuid=True), nullable=True)
+    provided_by = Column(Uuid, nullable=True)
     feedback_date = Column(DateTime(timezone=True), server_default=func.now())
     created_at = Column(DateTime(timezone=True), server_default=func.now())
 
@@ -137,8 +142,8 @@ class FeatureImportance(Base):
     
     __tablename__ = "feature_importance"
     
-    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
-    prediction_id = Column(UUID(as_uuid=True), ForeignKey("predictions.id"), nullable=False)
+    id = Column(Uuid, primary_key=True, default=uuid.uuid4)
+    prediction_id = Column(Uuid, ForeignKey("predictions.id"), nullable=False)
     feature_name = Column(String(100), nullable=False)
     importance_score = Column(Float, nullable=False)
     feature_value = Column(Float, nullable=True)
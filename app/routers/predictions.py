@@ -1,16 +1,24 @@
-from fastapi import APIRouter, Depends, HTTPException, BackgroundTasks, Request
-from fastapi.responses import JSONResponse
+from fastapi import APIRouter, Depends, HTTPException, BackgroundTasks, Request, Response, Query, Header
+from fastapi.exceptions import RequestValidationError
+from fastapi.responses import StreamingResponse
+import msgspec
+from pydantic import ValidationError
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, func, desc
-from typing import List, Optional
+from sqlalchemy import select, insert, func, desc, bindparam, type_coerce, Text
+from typing import List, Optional, Union
 import uuid
 from datetime import datetime, timedelta
 import logging
 import json
 import asyncio
+import hashlib
+import orjson
 
 from app.core.database import get_db
-from app.core.cache import get_redis_client, cache_key, prediction_cache_key, patient_history_cache_key
+from app.core.cache import (
+    get_redis_client, cache_key, prediction_cache_key, patient_history_cache_key,
+    prediction_result_cache_key, model_performance_cache_key
+)
 from app.models.prediction import (
     Prediction, ModelPerformance, BatchPrediction, PredictionAudit, 
     FeatureImportance, ModelRegistry
@@ -18,27 +26,134 @@ from app.models.prediction import (
 from app.schemas.prediction import (
     PredictionRequest, PredictionResponse, BatchPredictionRequest,
     BatchPredictionResponse, ModelPerformanceMetrics, ModelComparisonResponse,
-    PredictionHistoryResponse, ErrorResponse, FeatureImportanceItem
+    PredictionHistoryResponse, ErrorResponse, FeatureImportanceItem,
+    PredictionRequestFast, prediction_request_decoder, features_to_dict
 )
 from app.services.ml_service import MLService
+from app.services.prediction_events import PREDICTION_EVENTS_STREAM, PREDICTION_EVENTS_MAXLEN
 from app.core.config import get_settings
+from app.core.orjson_response import ORJSONResponse, orjson_dumps
 
-router = APIRouter()
+router = APIRouter(default_response_class=ORJSONResponse)
 settings = get_settings()
 logger = logging.getLogger(__name__)
 
+# Columns needed to build a PredictionResponse; list endpoints load only these
+# so the large input_features blob never leaves the database on the read path
+PREDICTION_RESPONSE_COLUMNS = (
+    Prediction.id,
+    Prediction.patient_id,
+    Prediction.risk_score,
+    Prediction.confidence_interval_lower,
+    Prediction.confidence_interval_upper,
+    Prediction.risk_level,
+    Prediction.model_name,
+    Prediction.model_version,
+    Prediction.feature_importance,
+    Prediction.recommendations,
+    Prediction.processing_time_ms,
+    Prediction.created_at
+)
+
+# How long serialized model performance responses are served from cache
+MODEL_PERFORMANCE_CACHE_TTL_SECONDS = 60
+
+# Default patient history page size; only the first page of this size is cached
+PATIENT_HISTORY_PAGE_SIZE = 10
+
+# Statements built once at import; per-request values are bound at execution
+GET_PREDICTION = select(Prediction).where(Prediction.id == bindparam("prediction_id"))
+GET_BATCH = select(BatchPrediction).where(BatchPrediction.batch_id == bindparam("batch_id"))
+# Batch results read feature_importance as raw JSON text (see get_batch_prediction)
+LIST_BATCH_PREDICTIONS = (
+    select(*(
+        type_coerce(column, Text).label(column.key) if column is Prediction.feature_importance
+        else column
+        for column in PREDICTION_RESPONSE_COLUMNS
+    ))
+    .where(Prediction.batch_id == bindparam("batch_id"))
+)
+LIST_PATIENT_PREDICTIONS = (
+    select(*PREDICTION_RESPONSE_COLUMNS, func.count().over().label("total"))
+    .where(Prediction.patient_id == bindparam("patient_id"))
+    .order_by(desc(Prediction.created_at))
+    .offset(bindparam("offset"))
+    .limit(bindparam("limit"))
+)
+COUNT_PATIENT_PREDICTIONS = (
+    select(func.count(Prediction.id))
+    .where(Prediction.patient_id == bindparam("patient_id"))
+)
+
+def prediction_to_dict(prediction) -> dict:
+    """Map a PREDICTION_RESPONSE_COLUMNS row to the PredictionResponse JSON shape"""
+    return {
+        "prediction_id": prediction.id,
+        "patient_id": prediction.patient_id,
+        "risk_score": prediction.risk_score,
+        "confidence_interval": [
+            prediction.confidence_interval_lower,
+            prediction.confidence_interval_upper
+        ],
+        "risk_level": prediction.risk_level,
+        "model_used": prediction.model_name,
+        "model_version": prediction.model_version,
+        "feature_importance": prediction.feature_importance or None,
+        "recommendations": prediction.recommendations,
+        "processing_time_ms": prediction.processing_time_ms,
+        "created_at": prediction.created_at
+    }
+
+def trim_feature_importance(predictions: List[dict], top_k: Optional[int]) -> List[dict]:
+    """Keep the top_k feature importance items of each prediction dict"""
+    if top_k is None:
+        return predictions
+    # Stored lists are already sorted by importance (see MLService), so the
+    # top k items are a prefix
+    return [
+        {**prediction, "feature_importance": (prediction["feature_importance"] or [])[:top_k] or None}
+        for prediction in predictions
+    ]
+
 # Dependency to get ML service
 async def get_ml_service(request: Request) -> MLService:
     """Get ML service from application state"""
     return request.app.state.ml_service
 
-@router.post("/predictions/", response_model=PredictionResponse)
+async def parse_prediction_request(
+    http_request: Request
+) -> Union[PredictionRequestFast, PredictionRequest]:
+    """Decode the prediction body straight into msgspec structs"""
+    body = await http_request.body()
+    try:
+        return prediction_request_decoder.decode(body)
+    except msgspec.DecodeError:
+        # Re-validate with Pydantic so clients get FastAPI's error format;
+        # it also accepts the field-name spellings of aliased features
+        try:
+            return PredictionRequest.model_validate_json(body)
+        except ValidationError as e:
+            raise RequestValidationError(
+                [{**error, "loc": ("body", *error["loc"])} for error in e.errors(include_url=False)]
+            )
+
+@router.post(
+    "/predictions/",
+    response_model=PredictionResponse,
+    openapi_extra={
+        "requestBody": {
+            "content": {"application/json": {"schema": PredictionRequest.model_json_schema()}},
+            "required": True
+        }
+    }
+)
 async def create_prediction(
-    request: PredictionRequest,
     background_tasks: BackgroundTasks,
+    request: Union[PredictionRequestFast, PredictionRequest] = Depends(parse_prediction_request),
     db: AsyncSession = Depends(get_db),
     ml_service: MLService = Depends(get_ml_service),
-    cache = Depends(get_redis_client)
+    cache = Depends(get_redis_client),
+    if_none_match: Optional[str] = Header(None)
 ):
     """
     Generate ML prediction for a patient
@@ -49,41 +164,70 @@ async def create_prediction(
     try:
         # Calculate features hash for caching
         features_hash = ml_service.calculate_features_hash(request.features)
-        cache_key_str = prediction_cache_key(str(request.patient_id), features_hash)
+        # The response depends on the model (and its loaded version) and on
+        # whether feature importance was asked for, not just the features
+        resolved_model = getattr(request.model_name, "value", request.model_name) or settings.DEFAULT_MODEL
+        model_version = ml_service.model_versions.get(resolved_model)
+        cache_key_str = prediction_cache_key(
+            request.patient_id,
+            resolved_model,
+            model_version,
+            features_hash,
+            request.include_feature_importance
+        )
+        
+        # The client already holds this exact prediction
+        etag = (
+            f'"{request.patient_id.hex}-{resolved_model}-{model_version}-'
+            f'{features_hash}-{int(request.include_feature_importance)}"'
+        )
+        if if_none_match == etag:
+            return Response(status_code=304, headers={"ETag": etag})
         
-        # Check cache first
-        cached_prediction = await cache.get_json(cache_key_str)
+        # Check cache first; cached entries are the serialized response body
+        cached_prediction = await cache.get_bytes(cache_key_str)
         if cached_prediction:
-            logger.info(f"Returning cached prediction for patient {request.patient_id}")
-            return PredictionResponse(**cached_prediction)
+            logger.info("Returning cached prediction for patient %s", request.patient_id)
+            return Response(
+                content=cached_prediction, media_type="application/json", headers={"ETag": etag}
+            )
         
         # Generate prediction
         prediction_result = await ml_service.predict(
             request.features,
             request.model_name,
-            request.include_feature_importance
+            request.include_feature_importance,
+            features_hash=features_hash
         )
         
-        # Create prediction record
+        # Insert the prediction record; RETURNING hands back the server-set
+        # created_at in the same round trip instead of a refresh SELECT
         prediction_id = uuid.uuid4()
-        prediction_record = Prediction(
-            id=prediction_id,
-            patient_id=request.patient_id,
-            model_name=prediction_result["model_used"],
-            model_version=prediction_result["model_version"],
-            risk_score=prediction_result["risk_score"],
-            confidence_interval_lower=prediction_result["confidence_interval"][0],
-            confidence_interval_upper=prediction_result["confidence_interval"][1],
-            risk_level=prediction_result["risk_level"],
-            feature_importance=prediction_result.get("feature_importance", []),
-            input_features=request.features.dict(),
-            recommendations=prediction_result.get("recommendations", []),
-            processing_time_ms=prediction_result.get("processing_time_ms")
+        result = await db.execute(
+            insert(Prediction).values(
+                id=prediction_id,
+                patient_id=request.patient_id,
+                model_name=prediction_result["model_used"],
+                model_version=prediction_result["model_version"],
+                risk_score=prediction_result["risk_score"],
+                confidence_interval_lower=prediction_result["confidence_interval"][0],
+                confidence_interval_upper=prediction_result["confidence_interval"][1],
+                risk_level=prediction_result["risk_level"],
+                feature_importance=prediction_result.get("feature_importance", []),
+                input_features=features_to_dict(request.features),
+                recommendations=prediction_result.get("recommendations", []),
+                processing_time_ms=prediction_result.get("processing_time_ms")
+            ).returning(Prediction.created_at)
         )
+        created_at = result.scalar_one()
         
-        db.add(prediction_record)
+        # Audit record goes in the same transaction as the prediction
+        db.add(PredictionAudit(
+            prediction_id=prediction_id,
+            action="created",
+            details={"model_used": prediction_result["model_used"]}
+        ))
         await db.commit()
-        await db.refresh(prediction_record)
         
         # Create response
         response = PredictionResponse(
@@ -97,42 +241,32 @@ async def create_prediction(
             feature_importance=prediction_result.get("feature_importance"),
             recommendations=prediction_result.get("recommendations"),
             processing_time_ms=prediction_result.get("processing_time_ms"),
-            created_at=prediction_record.created_at
+            created_at=created_at
         )
         
-        # Cache the response
-        await cache.set_json(cache_key_str, response.dict())
-        
-        # Add audit trail in background
-        background_tasks.add_task(
-            create_audit_record,
-            prediction_id,
-            "created",
-            db,
-            user_id=None,
-            details={"model_used": prediction_result["model_used"]}
+        # Serialize once and reuse the bytes for both the cache and the response
+        response_body = response.model_dump_json().encode()
+        
+        # Cache the response, invalidate the patient's history and publish one
+        # event for performance metrics, all in a single pipelined round trip
+        # that does not hold up the request
+        cache.set_bytes_with_event_nowait(
+            cache_key_str,
+            response_body,
+            PREDICTION_EVENTS_STREAM,
+            {
+                "model_used": prediction_result["model_used"],
+                "processing_time_ms": prediction_result["processing_time_ms"]
+            },
+            delete_keys=[patient_history_cache_key(request.patient_id)],
+            maxlen=PREDICTION_EVENTS_MAXLEN
         )
         
-        # Update model performance metrics in background
-        background_tasks.add_task(
-            update_model_performance,
-            prediction_result["model_used"],
-            prediction_result["processing_time_ms"],
-            db
-        )
-        
-        # Clear patient history cache
-        background_tasks.add_task(
-            clear_patient_cache,
-            str(request.patient_id),
-            cache
-        )
-        
-        logger.info(f"Created prediction {prediction_id} for patient {request.patient_id}")
-        return response
+        logger.info("Created prediction %s for patient %s", prediction_id, request.patient_id)
+        return Response(content=response_body, media_type="application/json", headers={"ETag": etag})
         
     except Exception as e:
-        logger.error(f"Error creating prediction: {e}")
+        logger.error("Error creating prediction: %s", e)
         raise HTTPException(
             status_code=500,
             detail=f"Error generating prediction: {str(e)}"
@@ -141,8 +275,10 @@ async def create_prediction(
 @router.get("/predictions/{prediction_id}", response_model=PredictionResponse)
 async def get_prediction(
     prediction_id: uuid.UUID,
+    http_response: Response,
     db: AsyncSession = Depends(get_db),
-    background_tasks: BackgroundTasks = None
+    background_tasks: BackgroundTasks = None,
+    if_none_match: Optional[str] = Header(None)
 ):
     """
     Get prediction details with confidence intervals
@@ -152,9 +288,7 @@ async def get_prediction(
     """
     try:
         # Query prediction
-        result = await db.execute(
-            select(Prediction).where(Prediction.id == prediction_id)
-        )
+        result = await db.execute(GET_PREDICTION, {"prediction_id": prediction_id})
         prediction = result.scalar_one_or_none()
         
         if not prediction:
@@ -163,6 +297,14 @@ async def get_prediction(
                 detail=f"Prediction {prediction_id} not found"
             )
         
+        # Version the representation by the row's last update
+        updated_at = prediction.updated_at or prediction.created_at
+        etag_source = prediction.id.bytes + updated_at.isoformat().encode()
+        etag = f'"{hashlib.blake2b(etag_source, digest_size=8).hexdigest()}"'
+        if if_none_match == etag:
+            return Response(status_code=304, headers={"ETag": etag})
+        http_response.headers["ETag"] = etag
+        
         # Convert feature importance from JSON to objects
         feature_importance = None
         if prediction.feature_importance:
@@ -203,7 +345,7 @@ async def get_prediction(
     except HTTPException:
         raise
     except Exception as e:
-        logger.error(f"Error retrieving prediction {prediction_id}: {e}")
+        logger.error("Error retrieving prediction %s: %s", prediction_id, e)
         raise HTTPException(
             status_code=500,
             detail=f"Error retrieving prediction: {str(e)}"
@@ -212,8 +354,9 @@ async def get_prediction(
 @router.get("/predictions/patient/{patient_id}", response_model=PredictionHistoryResponse)
 async def get_patient_predictions(
     patient_id: uuid.UUID,
-    limit: int = 10,
+    limit: int = PATIENT_HISTORY_PAGE_SIZE,
     offset: int = 0,
+    top_k: Optional[int] = Query(None, ge=0, description="Feature importance items to return per prediction"),
     db: AsyncSession = Depends(get_db),
     cache = Depends(get_redis_client)
 ):
@@ -221,93 +364,88 @@ async def get_patient_predictions(
     Get patient prediction history
     
     Returns all predictions for a specific patient with pagination support.
+    Pass top_k to return only the most important features of each prediction.
     """
     try:
-        # Check cache first
-        cache_key_str = patient_history_cache_key(str(patient_id))
-        cached_history = await cache.get_json(cache_key_str)
+        # Only the default first page is cached (a single key that new
+        # predictions invalidate); other pages always go to the database
+        cacheable = offset == 0 and limit == PATIENT_HISTORY_PAGE_SIZE
+        cache_key_str = patient_history_cache_key(patient_id)
+        cached_history = await cache.get(cache_key_str) if cacheable else None
         
         if cached_history:
-            # Apply pagination to cached results
-            predictions = cached_history["predictions"][offset:offset + limit]
-            return PredictionHistoryResponse(
-                patient_id=patient_id,
-                total_predictions=cached_history["total_predictions"],
-                predictions=[PredictionResponse(**p) for p in predictions]
+            # Cached results are already JSON-ready so no PredictionResponse
+            # objects are rebuilt
+            cached_history["predictions"] = trim_feature_importance(
+                cached_history["predictions"], top_k
             )
+            return ORJSONResponse(content=cached_history)
+        
+        # Query the page and the total count in one round trip
+        rows = (await db.execute(
+            LIST_PATIENT_PREDICTIONS,
+            {"patient_id": patient_id, "offset": offset, "limit": limit}
+        )).all()
+        
+        if rows:
+            total_predictions = rows[0].total
+        elif offset:
+            # Page past the end: the window count is unavailable, count directly
+            count_result = await db.execute(
+                COUNT_PATIENT_PREDICTIONS, {"patient_id": patient_id}
+            )
+            total_predictions = count_result.scalar()
+        else:
+            total_predictions = 0
         
-        # Query from database
-        count_result = await db.execute(
-            select(func.count(Prediction.id))
-            .where(Prediction.patient_id == patient_id)
-        )
-        total_predictions = count_result.scalar()
-        
-        predictions_result = await db.execute(
-            select(Prediction)
-            .where(Prediction.patient_id == patient_id)
-            .order_by(desc(Prediction.created_at))
-            .offset(offset)
-            .limit(limit)
-        )
-        predictions = predictions_result.scalars().all()
-        
-        # Convert to response format
-        prediction_responses = []
-        for prediction in predictions:
-            feature_importance = None
-            if prediction.feature_importance:
-                feature_importance = [
-                    FeatureImportanceItem(**item) 
-                    for item in prediction.feature_importance
-                ]
-            
-            prediction_responses.append(PredictionResponse(
-                prediction_id=prediction.id,
-                patient_id=prediction.patient_id,
-                risk_score=prediction.risk_score,
-                confidence_interval=[
-                    prediction.confidence_interval_lower,
-                    prediction.confidence_interval_upper
-                ],
-                risk_level=prediction.risk_level,
-                model_used=prediction.model_name,
-                model_version=prediction.model_version,
-                feature_importance=feature_importance,
-                recommendations=prediction.recommendations,
-                processing_time_ms=prediction.processing_time_ms,
-                created_at=prediction.created_at
-            ))
-        
-        response = PredictionHistoryResponse(
-            patient_id=patient_id,
-            total_predictions=total_predictions,
-            predictions=prediction_responses
-        )
+        # Rows come from our own table, so build the response JSON shape
+        # directly instead of validating a PredictionResponse per row
+        response = {
+            "patient_id": patient_id,
+            "total_predictions": total_predictions,
+            "predictions": [prediction_to_dict(row) for row in rows]
+        }
         
-        # Cache the response (without pagination)
-        if offset == 0:
-            await cache.set_json(cache_key_str, {
-                "patient_id": str(patient_id),
-                "total_predictions": total_predictions,
-                "predictions": [p.dict() for p in prediction_responses]
-            })
+        # Cache the default first page as compact msgpack
+        if cacheable:
+            await cache.set(cache_key_str, response)
         
-        return response
+        response["predictions"] = trim_feature_importance(response["predictions"], top_k)
+        return ORJSONResponse(content=response)
         
     except Exception as e:
-        logger.error(f"Error retrieving patient predictions for {patient_id}: {e}")
+        logger.error("Error retrieving patient predictions for %s: %s", patient_id, e)
         raise HTTPException(
             status_code=500,
             detail=f"Error retrieving patient predictions: {str(e)}"
         )
 
-@router.post("/predictions/batch", response_model=BatchPredictionResponse)
+async def parse_batch_request(http_request: Request) -> BatchPredictionRequest:
+    """Validate the batch body straight from bytes with pydantic-core's JSON parser"""
+    try:
+        return BatchPredictionRequest.model_validate_json(await http_request.body())
+    except ValidationError as e:
+        # Report errors the same way FastAPI does for declared bodies
+        raise RequestValidationError(
+            [{**error, "loc": ("body", *error["loc"])} for error in e.errors(include_url=False)]
+        )
+
+@router.post(
+    "/predictions/batch",
+    response_model=BatchPredictionResponse,
+    openapi_extra={
+        "requestBody": {
+            "content": {"application/json": {"schema": BatchPredictionRequest.model_json_schema()}},
+            "required": True
+        }
+    }
+)
 async def create_batch_prediction(
-    request: BatchPredictionRequest,
     background_tasks: BackgroundTasks,
+    request: BatchPredictionRequest = Depends(parse_batch_request),
     db: AsyncSession = Depends(get_db),
-    ml_service: MLService = Depends(get_ml_service)
+    ml_service: MLService = Depends(get_ml_service),
+    cache = Depends(get_redis_client)
 ):
     """
     Process batch predictions
@@ -343,7 +481,8 @@ async def create_batch_prediction(
             request.predictions,
             request.model_name,
             db,
-            ml_service
+            ml_service,
+            cache
         )
         
         response = BatchPredictionResponse(
@@ -356,11 +495,11 @@ async def create_batch_prediction(
             started_at=batch_record.started_at
         )
         
-        logger.info(f"Created batch prediction {batch_id} with {len(request.predictions)} records")
+        logger.info("Created batch prediction %s with %d records", batch_id, len(request.predictions))
         return response
         
     except Exception as e:
-        logger.error(f"Error creating batch prediction: {e}")
+        logger.error("Error creating batch prediction: %s", e)
         raise HTTPException(
             status_code=500,
             detail=f"Error creating batch prediction: {str(e)}"
@@ -378,9 +517,7 @@ async def get_batch_prediction(
     """
     try:
         # Query batch record
-        result = await db.execute(
-            select(BatchPrediction).where(BatchPrediction.batch_id == batch_id)
-        )
+        result = await db.execute(GET_BATCH, {"batch_id": batch_id})
         batch_record = result.scalar_one_or_none()
         
         if not batch_record:
@@ -389,40 +526,6 @@ async def get_batch_prediction(
                 detail=f"Batch prediction {batch_id} not found"
             )
         
-        # Get associated predictions if completed
-        predictions = None
-        if batch_record.status == "completed":
-            predictions_result = await db.execute(
-                select(Prediction).where(Prediction.batch_id == batch_id)
-            )
-            prediction_records = predictions_result.scalars().all()
-            
-            predictions = []
-            for prediction in prediction_records:
-                feature_importance = None
-                if prediction.feature_importance:
-                    feature_importance = [
-                        FeatureImportanceItem(**item) 
-                        for item in prediction.feature_importance
-                    ]
-                
-                predictions.append(PredictionResponse(
-                    prediction_id=prediction.id,
-                    patient_id=prediction.patient_id,
-                    risk_score=prediction.risk_score,
-                    confidence_interval=[
-                        prediction.confidence_interval_lower,
-                        prediction.confidence_interval_upper
-                    ],
-                    risk_level=prediction.risk_level,
-                    model_used=prediction.model_name,
-                    model_version=prediction.model_version,
-                    feature_importance=feature_importance,
-                    recommendations=prediction.recommendations,
-                    processing_time_ms=prediction.processing_time_ms,
-                    created_at=prediction.created_at
-                ))
-        
         response = BatchPredictionResponse(
             batch_id=batch_record.batch_id,
             status=batch_record.status,
@@ -432,16 +535,38 @@ async def get_batch_prediction(
             model_name=batch_record.model_name,
             started_at=batch_record.started_at,
             completed_at=batch_record.completed_at,
-            error_message=batch_record.error_message,
-            predictions=predictions
+            error_message=batch_record.error_message
         )
         
-        return response
+        if batch_record.status != "completed":
+            return ORJSONResponse(content=response.model_dump(mode="json"))
+        
+        # Stream completed batches row by row instead of materializing every
+        # prediction as a Pydantic model; the body is still one JSON document
+        header = response.model_dump(mode="json", exclude={"predictions"})
+        prediction_rows = await db.stream(LIST_BATCH_PREDICTIONS, {"batch_id": batch_id})
+        
+        async def body():
+            yield orjson_dumps(header)[:-1] + b',"predictions":['
+            separator = b""
+            async for prediction in prediction_rows:
+                row = prediction_to_dict(prediction)
+                # Splice the stored JSON text in without parsing it; an empty
+                # list is reported as null like the other endpoints do
+                raw_importance = row["feature_importance"]
+                row["feature_importance"] = (
+                    orjson.Fragment(raw_importance) if raw_importance and raw_importance != "[]" else None
+                )
+                yield separator + orjson_dumps(row)
+                separator = b","
+            yield b"]}"
+        
+        return StreamingResponse(body(), media_type="application/json")
         
     except HTTPException:
         raise
     except Exception as e:
-        logger.error(f"Error retrieving batch prediction {batch_id}: {e}")
+        logger.error("Error retrieving batch prediction %s: %s", batch_id, e)
         raise HTTPException(
             status_code=500,
             detail=f"Error retrieving batch prediction: {str(e)}"
@@ -461,10 +586,16 @@ async def get_model_performance(
     including accuracy, precision, recall, and processing time.
     """
     try:
+        # Metrics change slowly, so serve a recently serialized copy
+        cache_key_str = model_performance_cache_key(model_name or "all")
+        cached_performance = await cache.get_bytes(cache_key_str)
+        if cached_performance is not None:
+            return Response(content=cached_performance, media_type="application/json")
+        
         if model_name:
             # Get performance for specific model
             performance = await ml_service.get_model_performance(model_name)
-            return ModelComparisonResponse(
+            response = ModelComparisonResponse(
                 models=[ModelPerformanceMetrics(**performance)],
                 comparison_date=datetime.now(),
                 recommended_model=model_name
@@ -472,14 +603,18 @@ async def get_model_performance(
         else:
             # Get comparison of all models
             comparison_result = await ml_service.compare_models()
-            return ModelComparisonResponse(
+            response = ModelComparisonResponse(
                 models=[ModelPerformanceMetrics(**model) for model in comparison_result["models"]],
                 comparison_date=comparison_result["comparison_date"],
                 recommended_model=comparison_result["recommended_model"]
             )
+        
+        response_body = response.model_dump_json().encode()
+        cache.set_bytes_nowait(cache_key_str, response_body, ttl=MODEL_PERFORMANCE_CACHE_TTL_SECONDS)
+        return Response(content=response_body, media_type="application/json")
             
     except Exception as e:
-        logger.error(f"Error retrieving model performance: {e}")
+        logger.error("Error retrieving model performance: %s", e)
         raise HTTPException(
             status_code=500,
             detail=f"Error retrieving model performance: {str(e)}"
@@ -504,81 +639,86 @@ async def create_audit_record(
         db.add(audit_record)
         await db.commit()
     except Exception as e:
-        logger.error(f"Error creating audit record: {e}")
-
-async def update_model_performance(
-    model_name: str,
-    processing_time_ms: int,
-    db: AsyncSession
-):
-    """Update model performance metrics"""
-    try:
-        # This would typically calculate real performance metrics
-        # For now, just log the processing time
-        logger.info(f"Model {model_name} processing time: {processing_time_ms}ms")
-    except Exception as e:
-        logger.error(f"Error updating model performance: {e}")
-
-async def clear_patient_cache(patient_id: str, cache):
-    """Clear patient history cache"""
-    try:
-        cache_key_str = patient_history_cache_key(patient_id)
-        await cache.delete(cache_key_str)
-    except Exception as e:
-        logger.error(f"Error clearing patient cache: {e}")
+        logger.error("Error creating audit record: %s", e)
 
 async def process_batch_predictions(
     batch_id: str,
     predictions: List[PredictionRequest],
     model_name: Optional[str],
     db: AsyncSession,
-    ml_service: MLService
+    ml_service: MLService,
+    cache
 ):
     """Process batch predictions in background"""
     try:
         # Update batch status to processing
-        result = await db.execute(
-            select(BatchPrediction).where(BatchPrediction.batch_id == batch_id)
-        )
+        result = await db.execute(GET_BATCH, {"batch_id": batch_id})
         batch_record = result.scalar_one()
         batch_record.status = "processing"
         await db.commit()
         
-        processed_count = 0
-        failed_count = 0
-        
-        # Process each prediction
-        for prediction_request in predictions:
+        # Look up cached model results for the whole batch in one round trip
+        resolved_model = getattr(model_name, "value", model_name) or settings.DEFAULT_MODEL
+        result_keys = [
+            prediction_result_cache_key(
+                resolved_model,
+                ml_service.calculate_features_hash(prediction_request.features),
+                prediction_request.include_feature_importance
+            )
+            for prediction_request in predictions
+        ]
+        prediction_results = await cache.mget(result_keys)
+        new_results = {}
+        
+        # Score all cache misses with a single batched model call
+        missing = [i for i, cached in enumerate(prediction_results) if cached is None]
+        if missing:
             try:
-                # Generate prediction
-                prediction_result = await ml_service.predict(
-                    prediction_request.features,
+                outcomes = await ml_service.predict_batch(
+                    [predictions[i].features for i in missing],
                     model_name,
-                    prediction_request.include_feature_importance
-                )
-                
-                # Create prediction record
-                prediction_record = Prediction(
-                    id=uuid.uuid4(),
-                    patient_id=prediction_request.patient_id,
-                    model_name=prediction_result["model_used"],
-                    model_version=prediction_result["model_version"],
-                    risk_score=prediction_result["risk_score"],
-                    confidence_interval_lower=prediction_result["confidence_interval"][0],
-                    confidence_interval_upper=prediction_result["confidence_interval"][1],
-                    risk_level=prediction_result["risk_level"],
-                    feature_importance=prediction_result.get("feature_importance", []),
-                    input_features=prediction_request.features.dict(),
-                    recommendations=prediction_result.get("recommendations", []),
-                    processing_time_ms=prediction_result.get("processing_time_ms")
+                    [predictions[i].include_feature_importance for i in missing]
                 )
-                
-                db.add(prediction_record)
-                processed_count += 1
-                
             except Exception as e:
-                logger.error(f"Error processing prediction in batch {batch_id}: {e}")
+                outcomes = [e] * len(missing)
+        else:
+            outcomes = []
+        for i, outcome in zip(missing, outcomes):
+            prediction_results[i] = outcome
+            if not isinstance(outcome, BaseException):
+                new_results[result_keys[i]] = outcome
+        
+        # Build rows for a single bulk insert
+        rows = []
+        failed_count = 0
+        for prediction_request, prediction_result in zip(predictions, prediction_results):
+            if isinstance(prediction_result, BaseException):
+                logger.error("Error processing prediction in batch %s: %s", batch_id, prediction_result)
                 failed_count += 1
+                continue
+            
+            rows.append({
+                "id": uuid.uuid4(),
+                "patient_id": prediction_request.patient_id,
+                "batch_id": batch_id,
+                "model_name": prediction_result["model_used"],
+                "model_version": prediction_result["model_version"],
+                "risk_score": prediction_result["risk_score"],
+                "confidence_interval_lower": prediction_result["confidence_interval"][0],
+                "confidence_interval_upper": prediction_result["confidence_interval"][1],
+                "risk_level": prediction_result["risk_level"],
+                "feature_importance": prediction_result.get("feature_importance", []),
+                "input_features": features_to_dict(prediction_request.features),
+                "recommendations": prediction_result.get("recommendations", []),
+                "processing_time_ms": prediction_result.get("processing_time_ms")
+            })
+        
+        if rows:
+            await db.execute(insert(Prediction), rows)
+        processed_count = len(rows)
+        
+        # Cache newly computed results in one round trip
+        await cache.mset(new_results)
         
         # Update batch record
         batch_record.processed_records = processed_count
@@ -588,44 +728,40 @@ async def process_batch_predictions(
         
         await db.commit()
         
-        logger.info(f"Completed batch {batch_id}: {processed_count} processed, {failed_count} failed")
+        logger.info("Completed batch %s: %d processed, %d failed", batch_id, processed_count, failed_count)
         
     except Exception as e:
-        logger.error(f"Error processing batch {batch_id}: {e}")
+        logger.error("Error processing batch %s: %s", batch_id, e)
         
         # Update batch record with error
         try:
-            result = await db.execute(
-                select(BatchPrediction).where(BatchPrediction.batch_id == batch_id)
-            )
+            result = await db.execute(GET_BATCH, {"batch_id": batch_id})
             batch_record = result.scalar_one()
             batch_record.status = "failed"
             batch_record.error_message = str(e)
             batch_record.completed_at = datetime.now()
             await db.commit()
         except Exception as update_error:
-            logger.error(f"Error updating batch record: {update_error}")
+            logger.error("Error updating batch record: %s", update_error)
 
-# Error handlers
-@router.exception_handler(HTTPException)
+# Error handlers (APIRouter cannot register these; main.py adds them to the app)
 async def http_exception_handler(request: Request, exc: HTTPException):
     """Handle HTTP exceptions"""
-    return JSONResponse(
+    return ORJSONResponse(
         status_code=exc.status_code,
         content=ErrorResponse(
             error=f"HTTP {exc.status_code}",
             message=exc.detail
-        ).dict()
+        ).model_dump()
     )
 
-@router.exception_handler(Exception)
 async def general_exception_handler(request: Request, exc: Exception):
     """Handle general exceptions"""
-    logger.error(f"Unhandled exception: {exc}")
-    return JSONResponse(
+    logger.error("Unhandled exception: %s", exc)
+    return ORJSONResponse(
         status_code=500,
         content=ErrorResponse(
             error="Internal Server Error",
             message="An unexpected error occurred"
-        ).dict()
-    )
\ No newline at end of file
+        ).model_dump()
+    )
@@ -1,5 +1,7 @@
-from pydantic import BaseModel, Field, validator
-from typing import List, Optional, Dict, Any, Union
+import msgspec
+from msgspec import Meta
+from pydantic import BaseModel, ConfigDict, Field, field_validator
+from typing import Annotated, List, Optional, Dict, Any, Tuple, Union
 from datetime import datetime
 from uuid import UUID
 from enum import Enum
@@ -87,6 +89,7 @@ class PatientFeatures(BaseModel):
     # Treatment changes
     change: Optional[str] = Field(None, description="Change in diabetic medications")
     diabetesMed: Optional[str] = Field(None, description="Diabetic medication prescribed")
+    # Outcome label, kept for auditing only; never used as a model input
     readmitted: Optional[str] = Field(None, description="Readmitted within 30 days")
     
     # Grouped features (engineered features)
@@ -99,9 +102,9 @@ class PatientFeatures(BaseModel):
     discharge_disposition_grouped: Optional[str] = Field(None, description="Grouped discharge disposition")
     admission_source_grouped: Optional[str] = Field(None, description="Grouped admission source")
     
-    class Config:
-        allow_population_by_field_name = True
-        schema_extra = {
+    model_config = ConfigDict(
+        populate_by_name=True,
+        json_schema_extra={
             "example": {
                 "age": 65,
                 "gender": "Male",
@@ -128,6 +131,7 @@ class PatientFeatures(BaseModel):
                 "diabetesMed": "Yes"
             }
         }
+    )
 
 class PredictionRequest(BaseModel):
     """Request schema for single prediction"""
@@ -137,21 +141,129 @@ class PredictionRequest(BaseModel):
     model_name: Optional[ModelType] = Field(None, description="Specific model to use")
     include_feature_importance: bool = Field(default=True, description="Include feature importance")
     include_recommendations: bool = Field(default=True, description="Include recommendations")
+    
+    # model_name is an API field, not Pydantic's model_ namespace
+    model_config = ConfigDict(protected_namespaces=())
+
+# msgspec mirrors of the single-prediction request. The hot prediction
+# endpoint decodes JSON straight into these; the Pydantic models above remain
+# the source of truth for the OpenAPI schema and for validation error details.
+# Unknown fields are rejected so bodies using the field-name spellings of
+# aliased features (e.g. "glyburide_metformin") fall back to Pydantic, which
+# accepts them, instead of being silently dropped.
+class PatientFeaturesFast(msgspec.Struct, frozen=True, gc=False, kw_only=True, forbid_unknown_fields=True):
+    """Patient features decoded with msgspec (mirrors PatientFeatures)"""
+    
+    # Demographics
+    age: Annotated[float, Meta(ge=0, le=150)]
+    gender: str
+    race: Optional[str] = None
+    weight: Optional[Annotated[float, Meta(ge=0, le=500)]] = None
+    
+    # Admission details
+    admission_type: Annotated[int, Meta(ge=1, le=8)]
+    discharge_disposition: Annotated[int, Meta(ge=1, le=30)]
+    admission_source: Annotated[int, Meta(ge=1, le=26)]
+    time_in_hospital: Annotated[int, Meta(ge=1, le=14)]
+    payer_code: Optional[str] = None
+    medical_specialty: Optional[str] = None
+    
+    # Medical procedures and tests
+    num_lab_procedures: Annotated[int, Meta(ge=0, le=150)]
+    num_procedures: Annotated[int, Meta(ge=0, le=10)]
+    num_medications: Annotated[int, Meta(ge=0, le=100)]
+    number_outpatient: Annotated[int, Meta(ge=0, le=50)]
+    number_emergency: Annotated[int, Meta(ge=0, le=50)]
+    number_inpatient: Annotated[int, Meta(ge=0, le=50)]
+    
+    # Diagnoses
+    diag_1: Optional[str] = None
+    diag_2: Optional[str] = None
+    diag_3: Optional[str] = None
+    number_diagnoses: Annotated[int, Meta(ge=1, le=16)]
+    
+    # Lab results
+    max_glu_serum: Optional[str] = None
+    A1Cresult: Optional[str] = None
+    
+    # Medications
+    metformin: Optional[str] = None
+    repaglinide: Optional[str] = None
+    nateglinide: Optional[str] = None
+    chlorpropamide: Optional[str] = None
+    glimepiride: Optional[str] = None
+    acetohexamide: Optional[str] = None
+    glipizide: Optional[str] = None
+    glyburide: Optional[str] = None
+    tolbutamide: Optional[str] = None
+    pioglitazone: Optional[str] = None
+    rosiglitazone: Optional[str] = None
+    acarbose: Optional[str] = None
+    miglitol: Optional[str] = None
+    troglitazone: Optional[str] = None
+    tolazamide: Optional[str] = None
+    examide: Optional[str] = None
+    citoglipton: Optional[str] = None
+    insulin: Optional[str] = None
+    
+    # Combination medications
+    glyburide_metformin: Optional[str] = msgspec.field(default=None, name="glyburide-metformin")
+    glipizide_metformin: Optional[str] = msgspec.field(default=None, name="glipizide-metformin")
+    glimepiride_pioglitazone: Optional[str] = msgspec.field(default=None, name="glimepiride-pioglitazone")
+    metformin_rosiglitazone: Optional[str] = msgspec.field(default=None, name="metformin-rosiglitazone")
+    metformin_pioglitazone: Optional[str] = msgspec.field(default=None, name="metformin-pioglitazone")
+    
+    # Treatment changes
+    change: Optional[str] = None
+    diabetesMed: Optional[str] = None
+    readmitted: Optional[str] = None
+    
+    # Grouped features (engineered features)
+    num_medications_grouped: Optional[Annotated[int, Meta(ge=0, le=5)]] = None
+    diag_1_grouped: Optional[str] = None
+    diag_2_grouped: Optional[str] = None
+    diag_3_grouped: Optional[str] = None
+    age_grouped: Optional[str] = None
+    admission_type_grouped: Optional[str] = None
+    discharge_disposition_grouped: Optional[str] = None
+    admission_source_grouped: Optional[str] = None
+
+class PredictionRequestFast(msgspec.Struct, frozen=True, gc=False, kw_only=True, forbid_unknown_fields=True):
+    """Single prediction request decoded with msgspec (mirrors PredictionRequest)"""
+    
+    patient_id: UUID
+    features: PatientFeaturesFast
+    model_name: Optional[ModelType] = None
+    include_feature_importance: bool = True
+    include_recommendations: bool = True
+
+# Reused decoder for the single-prediction request body
+prediction_request_decoder = msgspec.json.Decoder(PredictionRequestFast)
+
+def features_to_dict(features: Union[PatientFeatures, PatientFeaturesFast]) -> Dict[str, Any]:
+    """Return patient features as a dict keyed by field name"""
+    if isinstance(features, msgspec.Struct):
+        return msgspec.structs.asdict(features)
+    return features.model_dump()
 
 class BatchPredictionRequest(BaseModel):
     """Request schema for batch prediction"""
     
-    predictions: List[PredictionRequest] = Field(..., max_items=1000, description="List of predictions")
+    predictions: List[PredictionRequest] = Field(..., max_length=1000, description="List of predictions")
     model_name: Optional[ModelType] = Field(None, description="Model to use for all predictions")
     priority: str = Field(default="normal", description="Batch priority")
     
-    @validator('predictions')
+    model_config = ConfigDict(protected_namespaces=())
+    
+    @field_validator('predictions')
+    @classmethod
     def validate_predictions_not_empty(cls, v):
         if not v:
             raise ValueError("Predictions list cannot be empty")
         return v
 
-# Response schemas
+# Response schemas (models off the single-prediction hot path use
+# defer_build so their validators are only built on first use)
 class FeatureImportanceItem(BaseModel):
     """Feature importance item"""
     
@@ -171,13 +283,16 @@ class PredictionResponse(BaseModel):
     model_used: str
     model_version: str
     feature_importance: Optional[List[FeatureImportanceItem]] = None
-    recommendations: Optional[List[str]] = None
+    # Tuple for the shared recommendation tuples, list for rows read back
+    # from the database or cache; both serialize without a warning
+    recommendations: Optional[Union[Tuple[str, ...], List[str]]] = None
     processing_time_ms: Optional[int] = None
     created_at: datetime
     
-    class Config:
-        orm_mode = True
-        schema_extra = {
+    model_config = ConfigDict(
+        from_attributes=True,
+        protected_namespaces=(),
+        json_schema_extra={
             "example": {
                 "prediction_id": "123e4567-e89b-12d3-a456-426614174000",
                 "patient_id": "987fcdeb-51a2-43d1-9f12-123456789abc",
@@ -202,6 +317,7 @@ class PredictionResponse(BaseModel):
                 "created_at": "2024-01-15T10:30:00Z"
             }
         }
+    )
 
 class BatchPredictionResponse(BaseModel):
     """Response schema for batch prediction"""
@@ -216,6 +332,8 @@ class BatchPredictionResponse(BaseModel):
     completed_at: Optional[datetime] = None
     error_message: Optional[str] = None
     predictions: Optional[List[PredictionResponse]] = None
+    
+    model_config = ConfigDict(protected_namespaces=())
 
 class ModelPerformanceMetrics(BaseModel):
     """Model performance metrics"""
@@ -233,12 +351,13 @@ class ModelPerformanceMetrics(BaseModel):
     correct_predictions: int = 0
     evaluation_date: datetime
     
-    class Config:
-        orm_mode = True
+    model_config = ConfigDict(from_attributes=True, protected_namespaces=(), defer_build=True)
 
 class ModelComparisonResponse(BaseModel):
     """Response schema for model comparison"""
     
+    model_config = ConfigDict(defer_build=True)
+    
     models: List[ModelPerformanceMetrics]
     comparison_date: datetime
     recommended_model: Optional[str] = None
@@ -250,12 +369,13 @@ class PredictionHistoryResponse(BaseModel):
     total_predictions: int
     predictions: List[PredictionResponse]
     
-    class Config:
-        orm_mode = True
+    model_config = ConfigDict(from_attributes=True, defer_build=True)
 
 class ErrorResponse(BaseModel):
     """Error response schema"""
     
+    model_config = ConfigDict(defer_build=True)
+    
     error: str
     message: str
     details: Optional[Dict[str, Any]] = None
@@ -264,6 +384,8 @@ class ErrorResponse(BaseModel):
 class HealthCheckResponse(BaseModel):
     """Health check response"""
     
+    model_config = ConfigDict(defer_build=True)
+    
     status: str
     timestamp: datetime
     service: str
@@ -1,15 +1,16 @@
 import os
 import joblib
 import numpy as np
-import pandas as pd
-from typing import Dict, List, Optional, Tuple, Any
+from typing import Any, Callable, Dict, List, Optional, Tuple, get_args
 import logging
 from datetime import datetime
 import hashlib
-import json
+import struct
+import time
 from pathlib import Path
 import asyncio
 from concurrent.futures import ThreadPoolExecutor
+from cachetools import LRUCache
 
 # ML libraries
 import xgboost as xgb
@@ -25,16 +26,83 @@ from app.schemas.prediction import PatientFeatures, FeatureImportanceItem, RiskL
 settings = get_settings()
 logger = logging.getLogger(__name__)
 
+# Number of feature importance items returned per prediction
+TOP_FEATURE_IMPORTANCES = 10
+
+# Largest booster prediction run directly on the event loop (see _runs_inline)
+INLINE_PREDICTION_MAX_ROWS = 16
+
+# Risk levels indexed by the codes computed in MLService._predict_batch_sync
+RISK_LEVELS = (RiskLevel.LOW, RiskLevel.MEDIUM, RiskLevel.HIGH)
+
+# Recommendations for each risk level
+RECOMMENDATIONS_BY_LEVEL = {
+    RiskLevel.HIGH: (
+        "Schedule follow-up appointment within 7 days",
+        "Consider enhanced discharge planning",
+        "Review medication adherence",
+        "Assess social support systems",
+        "Consider home health services"
+    ),
+    RiskLevel.MEDIUM: (
+        "Schedule follow-up appointment within 14 days",
+        "Review discharge instructions with patient",
+        "Monitor for complications",
+        "Ensure medication reconciliation"
+    ),
+    RiskLevel.LOW: (
+        "Standard discharge planning",
+        "Follow-up as clinically indicated",
+        "Patient education on warning signs"
+    )
+}
+
+# Fixed field order for features hashing; PatientFeaturesFast uses the same
+# attribute names, so both representations hash identically
+HASH_FIELD_ORDER = tuple(PatientFeatures.model_fields)
+_pack_double = struct.Struct("<d").pack
+
+def _is_numeric(annotation: Any) -> bool:
+    """Whether a schema field holds only numbers (or None)"""
+    types = set(get_args(annotation) or (annotation,)) - {type(None)}
+    return bool(types) and types <= {int, float}
+
 class MLService:
     """Machine Learning service for hospital readmission prediction"""
     
+    __slots__ = (
+        "models", "model_versions", "model_features", "feature_encoders",
+        "feature_encoder_maps", "scalers", "executor", "_boosters",
+        "_top_importances", "_feature_names", "_feature_index", "_n_features",
+        "_compiled_encoder", "_encoded_cache"
+    )
+    
     def __init__(self):
         self.models: Dict[str, Any] = {}
         self.model_versions: Dict[str, str] = {}
         self.model_features: Dict[str, List[str]] = {}
         self.feature_encoders: Dict[str, Dict[str, Any]] = {}
+        self.feature_encoder_maps: Dict[str, Dict[str, int]] = {}
         self.scalers: Dict[str, StandardScaler] = {}
-        self.executor = ThreadPoolExecutor(max_workers=4)
+        # Native boosters of the XGBoost/LightGBM models, used for inference
+        self._boosters: Dict[str, Any] = {}
+        # Per model: (feature indices, importance scores, feature names) of
+        # the most important features, precomputed at load
+        self._top_importances: Dict[str, Tuple[np.ndarray, np.ndarray, List[str]]] = {}
+        self.executor = ThreadPoolExecutor(max_workers=os.cpu_count() or 4)
+        
+        # Column layout of the model input rows
+        self._feature_names: List[str] = list(settings.REQUIRED_FEATURES)
+        self._feature_index: Dict[str, int] = {
+            name: i for i, name in enumerate(self._feature_names)
+        }
+        self._n_features = len(self._feature_names)
+        
+        # Generated by _compile_encoder once the feature encoders exist
+        self._compiled_encoder: Optional[Callable[[Any, np.ndarray], None]] = None
+        
+        # Encoded feature rows keyed by features hash
+        self._encoded_cache = LRUCache(maxsize=4096)
         
     async def initialize(self):
         """Initialize ML service and load models"""
@@ -49,6 +117,7 @@ class MLService:
         
         # Initialize feature encoders
         await self._initialize_feature_encoders()
+        self._compiled_encoder = self._compile_encoder()
         
         logger.info(f"ML service initialized with {len(self.models)} models")
     
@@ -58,40 +127,71 @@ class MLService:
             "xgboost": {
                 "path": f"{settings.MODEL_PATH}/xgboost_model.joblib",
                 "class": xgb.XGBClassifier,
-                "version": "1.0.0"
+                "version": "1.0.0",
+                "mmap_mode": "r"
             },
             "lightgbm": {
                 "path": f"{settings.MODEL_PATH}/lightgbm_model.joblib",
                 "class": lgb.LGBMClassifier,
-                "version": "1.0.0"
+                "version": "1.0.0",
+                "mmap_mode": "r"
             },
             "random_forest": {
                 "path": f"{settings.MODEL_PATH}/random_forest_model.joblib",
                 "class": RandomForestClassifier,
-                "version": "1.0.0"
+                "version": "1.0.0",
+                "mmap_mode": None
             },
             "logistic_regression": {
                 "path": f"{settings.MODEL_PATH}/logistic_regression_model.joblib",
                 "class": LogisticRegression,
-                "version": "1.0.0"
+                "version": "1.0.0",
+                "mmap_mode": None
             }
         }
         
-        for model_name, config in model_configs.items():
-            try:
-                if os.path.exists(config["path"]):
-                    model = joblib.load(config["path"])
-                    self.models[model_name] = model
-                    self.model_versions[model_name] = config["version"]
-                    logger.info(f"Loaded model: {model_name}")
-                else:
-                    # Create a dummy model for demonstration
-                    model = self._create_dummy_model(model_name, config["class"])
-                    self.models[model_name] = model
-                    self.model_versions[model_name] = config["version"]
-                    logger.warning(f"Created dummy model for: {model_name}")
-            except Exception as e:
-                logger.error(f"Failed to load model {model_name}: {e}")
+        # Load (or train) all models concurrently in the thread pool
+        loop = asyncio.get_event_loop()
+        results = await asyncio.gather(
+            *(
+                loop.run_in_executor(self.executor, self._load_model_sync, model_name, config)
+                for model_name, config in model_configs.items()
+            ),
+            return_exceptions=True
+        )
+        
+        for (model_name, config), model in zip(model_configs.items(), results):
+            if isinstance(model, BaseException):
+                logger.error(f"Failed to load model {model_name}: {model}")
+                continue
+            
+            self.models[model_name] = model
+            self.model_versions[model_name] = config["version"]
+            self._cache_booster(model_name, model)
+            self._cache_top_importances(model_name, model)
+    
+    def _load_model_sync(self, model_name: str, config: Dict[str, Any]) -> Any:
+        """Load a model from disk, or create a dummy one if it is missing"""
+        if os.path.exists(config["path"]):
+            # Memory-mapped arrays are paged in on demand instead of read up front
+            model = joblib.load(config["path"], mmap_mode=config["mmap_mode"])
+            logger.info(f"Loaded model: {model_name}")
+        else:
+            # Create a dummy model for demonstration
+            model = self._create_dummy_model(model_name, config["class"])
+            logger.warning(f"Created dummy model for: {model_name}")
+        return model
+    
+    def _cache_booster(self, model_name: str, model: Any):
+        """Keep the native booster of a gradient boosting model for inference"""
+        try:
+            if isinstance(model, xgb.XGBClassifier):
+                self._boosters[model_name] = model.get_booster()
+            elif isinstance(model, lgb.LGBMClassifier):
+                self._boosters[model_name] = model.booster_
+        except Exception as e:
+            # Unfitted or unusual models fall back to predict_proba
+            logger.warning(f"Using predict_proba for model {model_name}: {e}")
     
     def _create_dummy_model(self, model_name: str, model_class):
         """Create a dummy model for demonstration purposes"""
@@ -124,7 +224,9 @@ class MLService:
         
         # Create dummy training data to fit the model
         dummy_features = self._create_dummy_features()
-        dummy_X = pd.DataFrame([dummy_features] * 100)
+        dummy_X = np.tile(
+            np.array(list(dummy_features.values()), dtype=np.float32), (100, 1)
+        )
         dummy_y = np.random.randint(0, 2, 100)
         
         model.fit(dummy_X, dummy_y)
@@ -177,7 +279,6 @@ class MLService:
             "metformin_pioglitazone": 0,
             "change": 1,
             "diabetesMed": 1,
-            "readmitted": 0,
             "weight": 0,
             "payer_code": 1,
             "medical_specialty": 1,
@@ -203,7 +304,7 @@ class MLService:
             "troglitazone", "tolazamide", "examide", "citoglipton",
             "insulin", "glyburide_metformin", "glipizide_metformin",
             "glimepiride_pioglitazone", "metformin_rosiglitazone",
-            "metformin_pioglitazone", "change", "diabetesMed", "readmitted",
+            "metformin_pioglitazone", "change", "diabetesMed",
             "payer_code", "medical_specialty", "diag_1", "diag_2", "diag_3"
         ]
         
@@ -212,15 +313,21 @@ class MLService:
             # Fit with common values
             encoder.fit(["No", "Yes", "Up", "Down", "Steady", "None", "Male", "Female"])
             self.feature_encoders[feature] = encoder
+            
+            # Plain dict lookup for inference instead of encoder.transform
+            self.feature_encoder_maps[feature] = {
+                str(cls): i for i, cls in enumerate(encoder.classes_)
+            }
     
     async def predict(
         self,
         patient_features: PatientFeatures,
         model_name: Optional[str] = None,
-        include_feature_importance: bool = True
+        include_feature_importance: bool = True,
+        features_hash: Optional[str] = None
     ) -> Dict[str, Any]:
         """Make prediction for a single patient"""
-        start_time = datetime.now()
+        start_ns = time.perf_counter_ns()
         
         # Use default model if none specified
         if model_name is None:
@@ -231,8 +338,15 @@ class MLService:
         
         model = self.models[model_name]
         
-        # Preprocess features
-        processed_features = await self._preprocess_features(patient_features)
+        # Reuse the encoded row for features seen recently
+        if features_hash is None:
+            features_hash = self.calculate_features_hash(patient_features)
+        processed_features = self._encoded_cache.get(features_hash)
+        if processed_features is None:
+            processed_features = await self._preprocess_features(patient_features)
+            # Read-only so concurrent requests can share the cached row
+            processed_features.setflags(write=False)
+            self._encoded_cache[features_hash] = processed_features
         
         # Make prediction
         prediction_result = await self._run_prediction(
@@ -240,58 +354,126 @@ class MLService:
         )
         
         # Calculate processing time
-        processing_time = (datetime.now() - start_time).total_seconds() * 1000
-        prediction_result["processing_time_ms"] = int(processing_time)
+        prediction_result["processing_time_ms"] = (time.perf_counter_ns() - start_ns) // 1_000_000
         prediction_result["model_version"] = self.model_versions[model_name]
         
         return prediction_result
     
-    async def _preprocess_features(self, patient_features: PatientFeatures) -> pd.DataFrame:
-        """Preprocess patient features for prediction"""
-        # Convert to dictionary
-        features_dict = patient_features.dict()
-        
-        # Handle categorical encoding
-        for feature, encoder in self.feature_encoders.items():
-            if feature in features_dict and features_dict[feature] is not None:
-                try:
-                    # Convert to string for consistency
-                    feature_value = str(features_dict[feature])
-                    
-                    # Handle unknown categories
-                    if feature_value not in encoder.classes_:
-                        # Use most common class or default
-                        feature_value = encoder.classes_[0]
-                    
-                    features_dict[feature] = encoder.transform([feature_value])[0]
-                except Exception as e:
-                    logger.warning(f"Error encoding feature {feature}: {e}")
-                    features_dict[feature] = 0
-        
-        # Handle missing values
-        for feature in settings.REQUIRED_FEATURES:
-            if feature not in features_dict:
-                features_dict[feature] = 0
-            elif features_dict[feature] is None:
-                features_dict[feature] = 0
-        
-        # Convert to DataFrame
-        feature_df = pd.DataFrame([features_dict])
-        
-        # Select only required features
-        available_features = [f for f in settings.REQUIRED_FEATURES if f in feature_df.columns]
-        feature_df = feature_df[available_features]
-        
-        return feature_df
+    async def predict_batch(
+        self,
+        patient_features_list: List[PatientFeatures],
+        model_name: Optional[str] = None,
+        include_feature_importance: Optional[List[bool]] = None
+    ) -> List[Dict[str, Any]]:
+        """Make predictions for several patients with a single model call"""
+        start_ns = time.perf_counter_ns()
+        
+        # Use default model if none specified
+        if model_name is None:
+            model_name = settings.DEFAULT_MODEL
+        
+        if model_name not in self.models:
+            raise ValueError(f"Model {model_name} not available")
+        
+        if not patient_features_list:
+            return []
+        
+        if include_feature_importance is None:
+            include_feature_importance = [True] * len(patient_features_list)
+        
+        model = self.models[model_name]
+        
+        # Encode every patient straight into one preallocated matrix
+        processed_features = np.zeros(
+            (len(patient_features_list), self._n_features), dtype=np.float32
+        )
+        for row, patient_features in zip(processed_features, patient_features_list):
+            self._encode_features(patient_features, row)
+        
+        # One model call for the whole batch
+        if self._runs_inline(model_name, len(processed_features)):
+            prediction_results = self._predict_batch_sync(
+                model, processed_features, model_name, include_feature_importance
+            )
+        else:
+            loop = asyncio.get_event_loop()
+            prediction_results = await loop.run_in_executor(
+                self.executor,
+                self._predict_batch_sync,
+                model,
+                processed_features,
+                model_name,
+                include_feature_importance
+            )
+        
+        # Processing time is amortized across the batch
+        processing_time_ns = time.perf_counter_ns() - start_ns
+        per_prediction_ms = processing_time_ns // 1_000_000 // len(prediction_results)
+        for prediction_result in prediction_results:
+            prediction_result["processing_time_ms"] = per_prediction_ms
+            prediction_result["model_version"] = self.model_versions[model_name]
+        
+        return prediction_results
+    
+    async def _preprocess_features(self, patient_features: PatientFeatures) -> np.ndarray:
+        """Preprocess patient features into a 1 x n_features float32 row"""
+        row = np.zeros((1, self._n_features), dtype=np.float32)
+        self._encode_features(patient_features, row[0])
+        return row
+    
+    def _encode_features(self, patient_features: PatientFeatures, out: np.ndarray):
+        """Encode patient features into a zeroed REQUIRED_FEATURES-ordered row"""
+        if self._compiled_encoder is None:
+            self._compiled_encoder = self._compile_encoder()
+        self._compiled_encoder(patient_features, out)
+    
+    def _compile_encoder(self) -> Callable[[Any, np.ndarray], None]:
+        """Generate an encoder specialized to the feature layout and encoders
+        
+        The generated function reads each model input attribute directly and
+        writes it to its fixed column, with the categorical lookup inlined, so
+        no per-request loop, index lookup or type check remains. It accepts
+        both PatientFeatures and PatientFeaturesFast.
+        """
+        namespace: Dict[str, Any] = {}
+        lines = ["def encode(features, out):"]
+        for name, field in PatientFeatures.model_fields.items():
+            # Model columns use the dashed aliases of the combination medications
+            index = self._feature_index.get(field.alias or name)
+            if index is None:
+                continue
+            
+            if name in self.feature_encoder_maps:
+                # Unknown categories map to the first class, as LabelEncoder
+                # would after substitution
+                namespace[f"enc_{name}"] = self.feature_encoder_maps[name]
+                value_expr = f"enc_{name}.get(str(value), 0)"
+            elif _is_numeric(field.annotation):
+                value_expr = "value"
+            else:
+                # Strings without an encoder cannot be fed to the model and stay 0
+                continue
+            
+            # Missing and None values stay 0
+            lines.append(f"    value = features.{name}")
+            lines.append("    if value is not None:")
+            lines.append(f"        out[{index}] = {value_expr}")
+        lines.append("    return None")
+        
+        exec(compile("\n".join(lines), "<compiled feature encoder>", "exec"), namespace)
+        return namespace["encode"]
     
     async def _run_prediction(
         self,
         model: Any,
-        features: pd.DataFrame,
+        features: np.ndarray,
         model_name: str,
         include_feature_importance: bool
     ) -> Dict[str, Any]:
         """Run prediction using the specified model"""
+        if self._runs_inline(model_name, len(features)):
+            return self._predict_sync(model, features, model_name, include_feature_importance)
+        
         loop = asyncio.get_event_loop()
         
         # Run prediction in thread pool
@@ -306,108 +488,123 @@ class MLService:
         
         return prediction_result
     
+    def _runs_inline(self, model_name: str, n_rows: int) -> bool:
+        """Whether a prediction is cheap enough to run on the event loop"""
+        # Native booster calls on a few rows take well under a millisecond,
+        # less than the thread pool handoff would cost
+        return model_name in self._boosters and n_rows <= INLINE_PREDICTION_MAX_ROWS
+    
     def _predict_sync(
         self,
         model: Any,
-        features: pd.DataFrame,
+        features: np.ndarray,
         model_name: str,
         include_feature_importance: bool
     ) -> Dict[str, Any]:
         """Synchronous prediction function"""
-        # Get prediction probabilities
-        pred_proba = model.predict_proba(features)
-        risk_score = float(pred_proba[0][1])  # Probability of readmission
-        
-        # Determine risk level
-        if risk_score < 0.3:
-            risk_level = RiskLevel.LOW
-        elif risk_score < 0.7:
-            risk_level = RiskLevel.MEDIUM
-        else:
-            risk_level = RiskLevel.HIGH
-        
-        # Calculate confidence interval (simplified)
-        confidence_lower = max(0.0, risk_score - 0.05)
-        confidence_upper = min(1.0, risk_score + 0.05)
-        
-        result = {
-            "risk_score": risk_score,
-            "confidence_interval": [confidence_lower, confidence_upper],
-            "risk_level": risk_level,
-            "model_used": model_name,
-            "recommendations": self._generate_recommendations(risk_score, risk_level)
-        }
+        return self._predict_batch_sync(
+            model, features, model_name, [include_feature_importance]
+        )[0]
+    
+    def _predict_batch_sync(
+        self,
+        model: Any,
+        features: np.ndarray,
+        model_name: str,
+        include_feature_importance: List[bool]
+    ) -> List[Dict[str, Any]]:
+        """Synchronous batch prediction function"""
+        # Probability of readmission for every row at once
+        risk_scores = self._predict_scores(model, features, model_name)
+        
+        # Determine risk levels: 0 = Low, 1 = Medium, 2 = High
+        risk_codes = np.select([risk_scores < 0.3, risk_scores < 0.7], [0, 1], default=2)
+        
+        # Calculate confidence intervals (simplified)
+        confidence_lower = np.clip(risk_scores - 0.05, 0.0, 1.0)
+        confidence_upper = np.clip(risk_scores + 0.05, 0.0, 1.0)
+        
+        results = []
+        for i, include_importance in enumerate(include_feature_importance):
+            risk_score = float(risk_scores[i])
+            risk_level = RISK_LEVELS[risk_codes[i]]
+            result = {
+                "risk_score": risk_score,
+                "confidence_interval": [float(confidence_lower[i]), float(confidence_upper[i])],
+                "risk_level": risk_level,
+                "model_used": model_name,
+                "recommendations": self._generate_recommendations(risk_score, risk_level)
+            }
+            
+            # Add feature importance if requested
+            if include_importance:
+                result["feature_importance"] = self._calculate_feature_importance(
+                    model_name, features[i]
+                )
+            
+            results.append(result)
         
-        # Add feature importance if requested
-        if include_feature_importance:
-            result["feature_importance"] = self._calculate_feature_importance(
-                model, features, model_name
+        return results
+    
+    def _predict_scores(self, model: Any, features: np.ndarray, model_name: str) -> np.ndarray:
+        """Predict readmission probabilities for a float32 feature matrix"""
+        booster = self._boosters.get(model_name)
+        if isinstance(booster, xgb.Booster):
+            # Predicts straight from the array without building a DMatrix
+            return booster.inplace_predict(features)
+        if booster is not None:
+            # LightGBM Booster: positive-class probability for binary models
+            return booster.predict(features)
+        return model.predict_proba(features)[:, 1]
+    
+    def _model_importances(self, model: Any) -> np.ndarray:
+        """Get global feature importances based on model type"""
+        if hasattr(model, 'feature_importances_'):
+            return model.feature_importances_
+        if hasattr(model, 'coef_'):
+            return np.abs(model.coef_[0])
+        # Fallback to dummy importance
+        return np.random.random(self._n_features)
+    
+    def _cache_top_importances(self, model_name: str, model: Any):
+        """Precompute a model's top feature importances, most important first"""
+        try:
+            importances = np.asarray(self._model_importances(model))[:self._n_features]
+            indices = np.argsort(-importances, kind="stable")[:TOP_FEATURE_IMPORTANCES]
+            self._top_importances[model_name] = (
+                indices,
+                importances[indices].astype(np.float64),
+                [self._feature_names[i] for i in indices]
             )
-        
-        return result
+        except Exception as e:
+            logger.error(f"Error calculating feature importance for {model_name}: {e}")
     
     def _calculate_feature_importance(
-        self, model: Any, features: pd.DataFrame, model_name: str
+        self, model_name: str, features: np.ndarray
     ) -> List[FeatureImportanceItem]:
-        """Calculate feature importance for explainability"""
-        try:
-            # Get feature importances based on model type
-            if hasattr(model, 'feature_importances_'):
-                importances = model.feature_importances_
-            elif hasattr(model, 'coef_'):
-                importances = np.abs(model.coef_[0])
-            else:
-                # Fallback to dummy importance
-                importances = np.random.random(len(features.columns))
-            
-            # Create feature importance items
-            feature_importance = []
-            for i, feature in enumerate(features.columns):
-                if i < len(importances):
-                    feature_importance.append(FeatureImportanceItem(
-                        feature_name=feature,
-                        importance_score=float(importances[i]),
-                        feature_value=float(features.iloc[0, i]),
-                        contribution=float(importances[i] * features.iloc[0, i])
-                    ))
-            
-            # Sort by importance score
-            feature_importance.sort(key=lambda x: x.importance_score, reverse=True)
-            
-            # Return top 10 features
-            return feature_importance[:10]
-            
-        except Exception as e:
-            logger.error(f"Error calculating feature importance: {e}")
+        """Calculate feature importance for one encoded row for explainability"""
+        top_importances = self._top_importances.get(model_name)
+        if top_importances is None:
             return []
+        
+        # Only the per-patient values change; the ranking is fixed per model
+        indices, scores, names = top_importances
+        values = features[indices].astype(np.float64)
+        contributions = values * scores
+        return [
+            FeatureImportanceItem(
+                feature_name=names[k],
+                importance_score=float(scores[k]),
+                feature_value=float(values[k]),
+                contribution=float(contributions[k])
+            )
+            for k in range(len(names))
+        ]
     
-    def _generate_recommendations(self, risk_score: float, risk_level: RiskLevel) -> List[str]:
+    def _generate_recommendations(self, risk_score: float, risk_level: RiskLevel) -> Tuple[str, ...]:
         """Generate recommendations based on risk score"""
-        recommendations = []
-        
-        if risk_level == RiskLevel.HIGH:
-            recommendations.extend([
-                "Schedule follow-up appointment within 7 days",
-                "Consider enhanced discharge planning",
-                "Review medication adherence",
-                "Assess social support systems",
-                "Consider home health services"
-            ])
-        elif risk_level == RiskLevel.MEDIUM:
-            recommendations.extend([
-                "Schedule follow-up appointment within 14 days",
-                "Review discharge instructions with patient",
-                "Monitor for complications",
-                "Ensure medication reconciliation"
-            ])
-        else:
-            recommendations.extend([
-                "Standard discharge planning",
-                "Follow-up as clinically indicated",
-                "Patient education on warning signs"
-            ])
-        
-        return recommendations
+        # Shared immutable tuples; nothing is allocated per prediction
+        return RECOMMENDATIONS_BY_LEVEL[risk_level]
     
     async def get_model_performance(self, model_name: str) -> Dict[str, Any]:
         """Get performance metrics for a specific model"""
@@ -430,11 +627,9 @@ class MLService:
     
     async def compare_models(self) -> Dict[str, Any]:
         """Compare performance of all available models"""
-        model_performances = []
-        
-        for model_name in self.models.keys():
-            performance = await self.get_model_performance(model_name)
-            model_performances.append(performance)
+        model_performances = list(await asyncio.gather(
+            *(self.get_model_performance(model_name) for model_name in self.models)
+        ))
         
         # Find best model based on F1 score
         best_model = max(model_performances, key=lambda x: x["f1_score"])
@@ -451,9 +646,24 @@ class MLService:
     
     def calculate_features_hash(self, features: PatientFeatures) -> str:
         """Calculate hash of features for caching"""
-        features_dict = features.dict()
-        features_str = json.dumps(features_dict, sort_keys=True)
-        return hashlib.md5(features_str.encode()).hexdigest()
+        # Pack every field in schema order into a tagged byte layout; the hash
+        # is only a cache key, so a fast 128-bit blake2b digest is sufficient
+        buf = bytearray()
+        for name in HASH_FIELD_ORDER:
+            value = getattr(features, name)
+            if value is None:
+                buf += b"\x00"
+            elif isinstance(value, str):
+                buf += b"\x01" + value.encode() + b"\x00"
+            else:
+                buf += b"\x02" + _pack_double(value)
+        return hashlib.blake2b(buf, digest_size=16).hexdigest()
+    
+    async def warmup(self):
+        """Score one row with every model so first requests skip lazy model setup"""
+        row = np.zeros((1, self._n_features), dtype=np.float32)
+        for model_name, model in self.models.items():
+            await self._run_prediction(model, row, model_name, True)
     
     async def cleanup(self):
         """Clean up resources"""
@@ -0,0 +1,142 @@
+import asyncio
+import logging
+import os
+import socket
+import time
+from collections import defaultdict
+from typing import Dict, List, Optional, Tuple
+
+from redis.exceptions import RedisError, ResponseError
+
+from app.core.cache import RedisCache
+
+logger = logging.getLogger(__name__)
+
+# Stream that create_prediction publishes post-request work to
+PREDICTION_EVENTS_STREAM = "prediction_events"
+PREDICTION_EVENTS_GROUP = "prediction_event_workers"
+
+# Approximate cap on stream length so unconsumed events cannot grow unbounded
+PREDICTION_EVENTS_MAXLEN = 100_000
+
+# Events delivered but not acknowledged for this long belong to a consumer
+# that died mid-batch; they are claimed and processed by a live one
+PREDICTION_EVENTS_CLAIM_IDLE_MS = 60_000
+PREDICTION_EVENTS_CLAIM_INTERVAL_SECONDS = 60
+
+# Reconnect backoff while Redis is unavailable
+MAX_BACKOFF_SECONDS = 30
+
+class PredictionEventConsumer:
+    """Apply prediction events from the Redis Stream in batches"""
+    
+    def __init__(
+        self,
+        cache: RedisCache,
+        consumer_name: Optional[str] = None,
+        batch_size: int = 100,
+        block_ms: int = 1000
+    ):
+        self.cache = cache
+        self.consumer_name = consumer_name or f"{socket.gethostname()}-{os.getpid()}"
+        self.batch_size = batch_size
+        self.block_ms = block_ms
+        self._group_ready = False
+        self._next_claim = 0.0
+    
+    async def _ensure_group(self):
+        """Create the consumer group if it does not exist yet"""
+        try:
+            await self.cache.redis_client.xgroup_create(
+                PREDICTION_EVENTS_STREAM, PREDICTION_EVENTS_GROUP, id="0", mkstream=True
+            )
+        except ResponseError as e:
+            if "BUSYGROUP" not in str(e):
+                raise
+        self._group_ready = True
+    
+    async def _claim_stale(self):
+        """Take over events left pending by consumers that stopped before acknowledging"""
+        start_id = "0-0"
+        while True:
+            response = await self.cache.redis_client.xautoclaim(
+                PREDICTION_EVENTS_STREAM,
+                PREDICTION_EVENTS_GROUP,
+                self.consumer_name,
+                min_idle_time=PREDICTION_EVENTS_CLAIM_IDLE_MS,
+                start_id=start_id,
+                count=self.batch_size
+            )
+            # Redis 7 also returns deleted ids as a third element
+            start_id, messages = response[0], response[1]
+            if messages:
+                logger.info("Claimed %d stale prediction events", len(messages))
+                await self.process(messages)
+            if start_id in (b"0-0", "0-0"):
+                return
+    
+    async def run(self):
+        """Consume events until cancelled"""
+        logger.info("Starting prediction event consumer %s", self.consumer_name)
+        backoff = 0
+        while True:
+            try:
+                if not self._group_ready:
+                    await self._ensure_group()
+                
+                # Recover stale pending events at startup and periodically
+                if time.monotonic() >= self._next_claim:
+                    await self._claim_stale()
+                    self._next_claim = time.monotonic() + PREDICTION_EVENTS_CLAIM_INTERVAL_SECONDS
+                
+                response = await self.cache.redis_client.xreadgroup(
+                    PREDICTION_EVENTS_GROUP,
+                    self.consumer_name,
+                    {PREDICTION_EVENTS_STREAM: ">"},
+                    count=self.batch_size,
+                    block=self.block_ms
+                )
+                if backoff:
+                    logger.info("Prediction event stream available again")
+                    backoff = 0
+                for _stream, messages in response or []:
+                    await self.process(messages)
+            except RedisError as e:
+                # Log the outage once, then retry quietly with exponential backoff
+                if not backoff:
+                    logger.warning("Prediction event stream unavailable, retrying: %s", e)
+                backoff = min(backoff * 2 or 1, MAX_BACKOFF_SECONDS)
+                # The group may be gone if Redis restarted without persistence
+                self._group_ready = False
+                await asyncio.sleep(backoff)
+    
+    async def process(self, messages: List[Tuple[bytes, Dict[bytes, bytes]]]):
+        """Apply one batch of events and acknowledge it"""
+        if not messages:
+            return
+        
+        message_ids = [message_id for message_id, _ in messages]
+        
+        try:
+            events = [
+                {k.decode(): v.decode() for k, v in fields.items()}
+                for _, fields in messages
+            ]
+            
+            # Model performance: aggregate processing times per model
+            processing_times = defaultdict(list)
+            for event in events:
+                processing_times[event["model_used"]].append(int(event["processing_time_ms"]))
+            for model_name, times in processing_times.items():
+                logger.info(
+                    "Model %s processed %d predictions, avg %.1fms",
+                    model_name, len(times), sum(times) / len(times)
+                )
+        except Exception:
+            # Events are metrics only and a malformed one would fail on every
+            # retry, so log and acknowledge rather than leave it pending
+            logger.exception("Error processing %d prediction events", len(messages))
+        
+        await self.cache.redis_client.xack(
+            PREDICTION_EVENTS_STREAM, PREDICTION_EVENTS_GROUP, *message_ids
+        )
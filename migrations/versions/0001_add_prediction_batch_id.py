@@ -0,0 +1,37 @@
+"""Add predictions.batch_id
+
+Batch rows are bulk-inserted with the batch they belong to, and batch
+status lookups filter predictions on it. Applies to databases created
+with Base.metadata.create_all before the column existed.
+
+Revision ID: 0001
+Revises:
+Create Date: 2026-10-15
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0001"
+down_revision: Union[str, None] = None
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column("predictions", sa.Column("batch_id", sa.String(100), nullable=True))
+    # Same name PostgreSQL gives the constraint when create_all builds the table
+    op.create_foreign_key(
+        "predictions_batch_id_fkey",
+        "predictions", "batch_predictions",
+        ["batch_id"], ["batch_id"]
+    )
+
+
+def downgrade() -> None:
+    op.drop_constraint("predictions_batch_id_fkey", "predictions", type_="foreignkey")
+    op.drop_column("predictions", "batch_id")
@@ -0,0 +1,39 @@
+"""Replace the patient_id index with the patient history index; index batch_id
+
+The composite (patient_id, created_at DESC) index serves the patient
+history query in order and covers lookups by patient_id alone, so the
+single-column index is dropped. batch_id is indexed for batch status
+lookups.
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-15
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0002"
+down_revision: Union[str, None] = "0001"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.drop_index("ix_predictions_patient_id", table_name="predictions")
+    op.create_index(
+        "ix_predictions_patient_created",
+        "predictions",
+        ["patient_id", sa.text("created_at DESC")]
+    )
+    op.create_index("ix_predictions_batch_id", "predictions", ["batch_id"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_predictions_batch_id", table_name="predictions")
+    op.drop_index("ix_predictions_patient_created", table_name="predictions")
+    op.create_index("ix_predictions_patient_id", "predictions", ["patient_id"])
@@ -8,8 +8,6 @@ This script provides a convenient way to start the application with different co
 import os
 import sys
 import argparse
-import uvicorn
-from pathlib import Path
 
 def main():
     """Main function to start the application"""
@@ -17,10 +15,14 @@ def main():
     parser = argparse.ArgumentParser(description="Hospital Readmission Prediction API")
     parser.add_argument("--host", default="0.0.0.0", help="Host to bind to")
     parser.add_argument("--port", type=int, default=8000, help="Port to bind to")
+    parser.add_argument("--uds", help="Bind to a Unix domain socket instead of host/port")
     parser.add_argument("--workers", type=int, default=1, help="Number of workers")
     parser.add_argument("--reload", action="store_true", help="Enable auto-reload")
     parser.add_argument("--debug", action="store_true", help="Enable debug mode")
     parser.add_argument("--log-level", default="info", choices=["critical", "error", "warning", "info", "debug", "trace"])
+    parser.add_argument("--warmup", action="store_true", help="Warm up models and database connections before serving")
+    parser.add_argument("--no-docs", action="store_true", help="Disable /docs, /redoc and /openapi.json")
+    parser.add_argument("--use-gunicorn", action="store_true", help="Manage multiple workers with gunicorn's UvicornWorker")
     
     args = parser.parse_args()
     
@@ -28,34 +30,61 @@ def main():
     if args.debug:
         os.environ["DEBUG"] = "true"
         os.environ["LOG_LEVEL"] = "DEBUG"
+    if args.warmup:
+        os.environ["WARMUP"] = "true"
+    if args.no_docs:
+        os.environ["DISABLE_DOCS"] = "true"
     
-    # Ensure models directory exists
-    models_dir = Path("models")
-    models_dir.mkdir(exist_ok=True)
+    # Ensure models and logs directories exist
+    for directory in ("models", "logs"):
+        os.makedirs(directory, exist_ok=True)
     
-    # Ensure logs directory exists
-    logs_dir = Path("logs")
-    logs_dir.mkdir(exist_ok=True)
+    # Start the application; one write, flushed so nothing is lost if we exec gunicorn
+    if args.uds:
+        location = [f"Socket: {args.uds}"]
+        url = lambda path: f"http://localhost{path} (via --unix-socket {args.uds})"
+    else:
+        location = [f"Host: {args.host}", f"Port: {args.port}"]
+        url = lambda path: f"http://{args.host}:{args.port}{path}"
+    lines = [
+        "Starting Hospital Readmission Prediction API...",
+        *location,
+        f"Workers: {args.workers}",
+        f"Reload: {args.reload}",
+        f"Debug: {args.debug}",
+        f"Log Level: {args.log_level}",
+    ]
+    if not args.no_docs:
+        lines.append(f"API Documentation: {url('/docs')}")
+    lines.append(f"Health Check: {url('/health')}")
+    sys.stdout.write("\n".join(lines) + "\n")
+    sys.stdout.flush()
     
-    # Start the application
-    print(f"Starting Hospital Readmission Prediction API...")
-    print(f"Host: {args.host}")
-    print(f"Port: {args.port}")
-    print(f"Workers: {args.workers}")
-    print(f"Reload: {args.reload}")
-    print(f"Debug: {args.debug}")
-    print(f"Log Level: {args.log_level}")
-    print(f"API Documentation: http://{args.host}:{args.port}/docs")
-    print(f"Health Check: http://{args.host}:{args.port}/health")
+    # Let gunicorn prefork and supervise the worker pool instead of uvicorn's multiprocess mode
+    if args.use_gunicorn and args.workers > 1 and not args.reload:
+        os.execvp("gunicorn", [
+            "gunicorn", "app.main:app",
+            "-k", "uvicorn.workers.UvicornWorker",
+            "-w", str(args.workers),
+            "--bind", f"unix:{args.uds}" if args.uds else f"{args.host}:{args.port}",
+            "--log-level", "debug" if args.log_level == "trace" else args.log_level
+        ])
+    
+    # Imported late so --help and the gunicorn path never load the server
+    import uvicorn
+    
+    # A local reverse proxy can reach a Unix socket without the TCP stack
+    bind = {"uds": args.uds} if args.uds else {"host": args.host, "port": args.port}
     
     try:
         uvicorn.run(
             "app.main:app",
-            host=args.host,
-            port=args.port,
+            **bind,
             workers=args.workers if not args.reload else 1,
             reload=args.reload,
             log_level=args.log_level,
+            loop="uvloop",
+            http="httptools",
             access_log=True,
             use_colors=True
         )
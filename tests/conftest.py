@@ -0,0 +1,104 @@
+import asyncio
+import os
+
+import httpx
+import pytest
+import pytest_asyncio
+from asgi_lifespan import LifespanManager
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.pool import StaticPool
+
+from app.main import app
+from app.core.database import Base, get_db, json_serializer
+
+# Create in-memory SQLite database for testing; StaticPool keeps the single
+# connection (and with it the database) alive across sessions. Each
+# pytest-xdist worker is its own process and gets its own database.
+XDIST_WORKER = os.environ.get("PYTEST_XDIST_WORKER", "gw0")
+SQLALCHEMY_DATABASE_URL = f"sqlite+aiosqlite:///file:memdb_{XDIST_WORKER}?mode=memory&cache=shared&uri=true"
+
+def set_sqlite_pragmas(dbapi_connection, connection_record):
+    """Skip fsyncs, journal files and per-statement locking on the test database"""
+    cursor = dbapi_connection.cursor()
+    cursor.execute("PRAGMA synchronous=OFF")
+    cursor.execute("PRAGMA journal_mode=MEMORY")
+    cursor.execute("PRAGMA locking_mode=EXCLUSIVE")
+    cursor.execute("PRAGMA temp_store=MEMORY")
+    cursor.close()
+    # Leave transaction control to SQLAlchemy (see begin_sqlite_transaction)
+    dbapi_connection.isolation_level = None
+
+def begin_sqlite_transaction(connection):
+    """Start transactions explicitly so nested SAVEPOINTs behave"""
+    connection.exec_driver_sql("BEGIN")
+
+@pytest.fixture(scope="session")
+def event_loop():
+    """One event loop for the whole session so the client can be shared"""
+    loop = asyncio.new_event_loop()
+    yield loop
+    loop.close()
+
+@pytest_asyncio.fixture(scope="session")
+async def db_engine():
+    """Engine with the schema created once for the whole test session"""
+    engine = create_async_engine(
+        SQLALCHEMY_DATABASE_URL,
+        connect_args={"check_same_thread": False},
+        poolclass=StaticPool,
+        json_serializer=json_serializer,
+    )
+    event.listen(engine.sync_engine, "connect", set_sqlite_pragmas)
+    # The driver's own transaction handling breaks SAVEPOINT; emit BEGIN ourselves
+    event.listen(engine.sync_engine, "begin", begin_sqlite_transaction)
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    yield engine
+    await engine.dispose()
+
+@pytest_asyncio.fixture(scope="session")
+async def db_connection(db_engine):
+    """Single connection holding an outer transaction that is never committed"""
+    async with db_engine.connect() as connection:
+        transaction = await connection.begin()
+        yield connection
+        await transaction.rollback()
+
+@pytest_asyncio.fixture(scope="session")
+async def client(db_engine):
+    """Async test client shared by every test"""
+    # ASGITransport does not send lifespan events; run startup (ML service,
+    # cache connection) and shutdown around the session ourselves
+    async with LifespanManager(app, startup_timeout=60) as manager:
+        transport = httpx.ASGITransport(app=manager.app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as async_client:
+            yield async_client
+    app.dependency_overrides.clear()
+
+@pytest_asyncio.fixture(autouse=True)
+async def db_session(db_connection):
+    """Run each test inside a SAVEPOINT that is rolled back on teardown"""
+    nested = await db_connection.begin_nested()
+    # Requests share the one connection, so they take turns using it
+    connection_lock = asyncio.Lock()
+
+    async def override_get_db():
+        async with connection_lock:
+            # Commits made by the app release a savepoint instead of the outer transaction
+            session = AsyncSession(
+                bind=db_connection,
+                join_transaction_mode="create_savepoint",
+                expire_on_commit=False
+            )
+            try:
+                yield session
+            finally:
+                await session.close()
+
+    app.dependency_overrides[get_db] = override_get_db
+    try:
+        yield
+    finally:
+        if nested.is_active:
+            await nested.rollback()
@@ -1,40 +1,19 @@
 import pytest
 import asyncio
-from fastapi.testclient import TestClient
-from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker
-from sqlalchemy.pool import StaticPool
+import time
 import uuid
+import warnings
+from datetime import datetime
+from functools import lru_cache
+from types import MappingProxyType
 
-from app.main import app
-from app.core.database import Base, get_db
-from app.schemas.prediction import PatientFeatures, PredictionRequest
+import orjson
 
-# Create in-memory SQLite database for testing
-SQLALCHEMY_DATABASE_URL = "sqlite:///./test.db"
-engine = create_engine(
-    SQLALCHEMY_DATABASE_URL,
-    connect_args={"check_same_thread": False},
-    poolclass=StaticPool,
-)
-TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
-
-Base.metadata.create_all(bind=engine)
-
-def override_get_db():
-    try:
-        db = TestingSessionLocal()
-        yield db
-    finally:
-        db.close()
-
-# Override the dependency
-app.dependency_overrides[get_db] = override_get_db
+from app.schemas.prediction import PatientFeatures, PredictionRequest, PredictionResponse, RiskLevel
+from app.services.ml_service import MLService, RECOMMENDATIONS_BY_LEVEL
 
-client = TestClient(app)
-
-# Test data
-SAMPLE_PATIENT_FEATURES = {
+# Test data (read-only so no test can leak changes into another)
+SAMPLE_PATIENT_FEATURES = MappingProxyType({
     "age": 65,
     "gender": "Male",
     "race": "Caucasian",
@@ -80,41 +59,59 @@ SAMPLE_PATIENT_FEATURES = {
     "change": "Ch",
     "diabetesMed": "Yes",
     "readmitted": "NO"
-}
+})
+
+@lru_cache(maxsize=1)
+def _sample_features() -> PatientFeatures:
+    """Validate the sample payload once for the whole module"""
+    return PatientFeatures(**SAMPLE_PATIENT_FEATURES)
 
-def test_health_check():
+# Serialized once; request bodies embed it verbatim instead of re-encoding the dict
+SAMPLE_FEATURES_JSON = orjson.Fragment(
+    _sample_features().model_dump_json(by_alias=True, exclude_none=True).encode()
+)
+JSON_HEADERS = {"content-type": "application/json"}
+
+async def post_json(client, url, payload):
+    """POST a payload encoded with orjson"""
+    return await client.post(url, content=orjson.dumps(payload), headers=JSON_HEADERS)
+
+@pytest.mark.asyncio
+async def test_health_check(client):
     """Test the health check endpoint"""
-    response = client.get("/health")
+    response = await client.get("/health")
     assert response.status_code == 200
-    data = response.json()
+    data = orjson.loads(response.content)
     assert data["status"] == "healthy"
     assert "timestamp" in data
     assert data["service"] == "hospital-readmission-prediction"
 
-def test_root_endpoint():
+@pytest.mark.asyncio
+async def test_root_endpoint(client):
     """Test the root endpoint"""
-    response = client.get("/")
+    response = await client.get("/")
     assert response.status_code == 200
-    data = response.json()
+    data = orjson.loads(response.content)
     assert data["message"] == "Hospital Readmission Prediction API"
     assert data["version"] == "1.0.0"
 
-def test_create_prediction():
+@pytest.mark.asyncio
+async def test_create_prediction(client):
     """Test creating a single prediction"""
     patient_id = str(uuid.uuid4())
     
     prediction_request = {
         "patient_id": patient_id,
-        "features": SAMPLE_PATIENT_FEATURES,
+        "features": SAMPLE_FEATURES_JSON,
         "model_name": "xgboost",
         "include_feature_importance": True,
         "include_recommendations": True
     }
     
-    response = client.post("/api/v1/predictions/", json=prediction_request)
+    response = await post_json(client, "/api/v1/predictions/", prediction_request)
     assert response.status_code == 200
     
-    data = response.json()
+    data = orjson.loads(response.content)
     assert "prediction_id" in data
     assert data["patient_id"] == patient_id
     assert "risk_score" in data
@@ -127,7 +124,8 @@ def test_create_prediction():
     assert "recommendations" in data
     assert "processing_time_ms" in data
 
-def test_create_prediction_validation_error():
+@pytest.mark.asyncio
+async def test_create_prediction_validation_error(client):
     """Test validation error when creating prediction with invalid data"""
     prediction_request = {
         "patient_id": "invalid-uuid",
@@ -138,74 +136,153 @@ def test_create_prediction_validation_error():
         }
     }
     
-    response = client.post("/api/v1/predictions/", json=prediction_request)
+    response = await post_json(client, "/api/v1/predictions/", prediction_request)
     assert response.status_code == 422  # Validation error
 
-def test_get_prediction():
+@pytest.mark.asyncio
+async def test_create_prediction_etag_varies_with_options(client):
+    """Test the prediction ETag changes with the model and feature importance flag"""
+    prediction_request = {
+        "patient_id": str(uuid.uuid4()),
+        "features": SAMPLE_FEATURES_JSON,
+        "model_name": "xgboost",
+        "include_feature_importance": True
+    }
+
+    response = await post_json(client, "/api/v1/predictions/", prediction_request)
+    assert response.status_code == 200
+    etag = response.headers["ETag"]
+
+    # Same options: the client's copy is still current
+    response = await client.post(
+        "/api/v1/predictions/",
+        content=orjson.dumps(prediction_request),
+        headers={**JSON_HEADERS, "if-none-match": etag}
+    )
+    assert response.status_code == 304
+
+    for changes in ({"include_feature_importance": False}, {"model_name": "lightgbm"}):
+        response = await client.post(
+            "/api/v1/predictions/",
+            content=orjson.dumps({**prediction_request, **changes}),
+            headers={**JSON_HEADERS, "if-none-match": etag}
+        )
+        assert response.status_code == 200
+        assert response.headers["ETag"] != etag
+
+@pytest.mark.asyncio
+async def test_create_prediction_accepts_field_name_spelling(client):
+    """Test aliased features sent by field name are kept, not dropped"""
+    patient_id = str(uuid.uuid4())
+    dashed = {**SAMPLE_PATIENT_FEATURES, "glyburide-metformin": "Up"}
+    underscored = {**SAMPLE_PATIENT_FEATURES, "glyburide_metformin": "Up"}
+    del underscored["glyburide-metformin"]
+
+    etags = []
+    for features in (dashed, underscored):
+        response = await post_json(
+            client, "/api/v1/predictions/", {"patient_id": patient_id, "features": features}
+        )
+        assert response.status_code == 200
+        etags.append(response.headers["ETag"])
+
+    # Both spellings hash to the same features, which differ from the sample's "No"
+    response = await post_json(
+        client, "/api/v1/predictions/", {"patient_id": patient_id, "features": SAMPLE_FEATURES_JSON}
+    )
+    assert etags[0] == etags[1]
+    assert response.headers["ETag"] != etags[0]
+
+@pytest.mark.asyncio
+async def test_get_prediction(client):
     """Test getting a specific prediction"""
     # First create a prediction
     patient_id = str(uuid.uuid4())
     prediction_request = {
         "patient_id": patient_id,
-        "features": SAMPLE_PATIENT_FEATURES,
+        "features": SAMPLE_FEATURES_JSON,
         "model_name": "xgboost"
     }
     
-    create_response = client.post("/api/v1/predictions/", json=prediction_request)
+    create_response = await post_json(client, "/api/v1/predictions/", prediction_request)
     assert create_response.status_code == 200
     
-    prediction_id = create_response.json()["prediction_id"]
+    prediction_id = orjson.loads(create_response.content)["prediction_id"]
     
     # Now get the prediction
-    get_response = client.get(f"/api/v1/predictions/{prediction_id}")
+    get_response = await client.get(f"/api/v1/predictions/{prediction_id}")
     assert get_response.status_code == 200
     
-    data = get_response.json()
+    data = orjson.loads(get_response.content)
     assert data["prediction_id"] == prediction_id
     assert data["patient_id"] == patient_id
 
-def test_get_prediction_not_found():
+@pytest.mark.asyncio
+async def test_get_prediction_not_found(client):
     """Test getting a non-existent prediction"""
     fake_id = str(uuid.uuid4())
-    response = client.get(f"/api/v1/predictions/{fake_id}")
+    response = await client.get(f"/api/v1/predictions/{fake_id}")
     assert response.status_code == 404
 
-def test_get_patient_predictions():
+@pytest.mark.asyncio
+async def test_get_patient_predictions(client):
     """Test getting prediction history for a patient"""
     patient_id = str(uuid.uuid4())
     
-    # Create multiple predictions for the same patient
-    for i in range(3):
-        prediction_request = {
-            "patient_id": patient_id,
-            "features": SAMPLE_PATIENT_FEATURES,
-            "model_name": "xgboost"
-        }
-        
-        response = client.post("/api/v1/predictions/", json=prediction_request)
-        assert response.status_code == 200
+    # Create multiple predictions for the same patient with one batch request
+    prediction_request = {
+        "patient_id": patient_id,
+        "features": SAMPLE_FEATURES_JSON
+    }
+    batch_request = {
+        "predictions": [prediction_request] * 3,
+        "model_name": "xgboost"
+    }
+    
+    response = await post_json(client, "/api/v1/predictions/batch", batch_request)
+    assert response.status_code == 200
+    batch_id = orjson.loads(response.content)["batch_id"]
+    
+    # Wait (bounded) for the batch to finish processing
+    deadline = time.monotonic() + 5.0
+    while True:
+        status_response = await client.get(f"/api/v1/predictions/batch/{batch_id}")
+        assert status_response.status_code == 200
+        if orjson.loads(status_response.content)["status"] == "completed":
+            break
+        assert time.monotonic() < deadline, "batch did not complete in time"
+        await asyncio.sleep(0.05)
     
     # Get patient history
-    history_response = client.get(f"/api/v1/predictions/patient/{patient_id}")
+    history_response = await client.get(f"/api/v1/predictions/patient/{patient_id}")
     assert history_response.status_code == 200
     
-    data = history_response.json()
+    data = orjson.loads(history_response.content)
     assert data["patient_id"] == patient_id
     assert data["total_predictions"] == 3
     assert len(data["predictions"]) == 3
+    
+    # Other pages are served in full, not sliced out of the cached first page
+    for params, expected_rows in (("limit=2", 2), ("offset=2", 1), ("limit=50", 3)):
+        page_response = await client.get(f"/api/v1/predictions/patient/{patient_id}?{params}")
+        assert page_response.status_code == 200
+        page = orjson.loads(page_response.content)
+        assert page["total_predictions"] == 3
+        assert len(page["predictions"]) == expected_rows
 
-def test_batch_prediction():
+@pytest.mark.asyncio
+async def test_batch_prediction(client):
     """Test batch prediction processing"""
     batch_request = {
         "predictions": [
             {
                 "patient_id": str(uuid.uuid4()),
-                "features": SAMPLE_PATIENT_FEATURES,
+                "features": SAMPLE_FEATURES_JSON,
                 "include_feature_importance": True
             },
             {
                 "patient_id": str(uuid.uuid4()),
-                "features": SAMPLE_PATIENT_FEATURES,
+                "features": SAMPLE_FEATURES_JSON,
                 "include_feature_importance": True
             }
         ],
@@ -213,48 +290,50 @@ def test_batch_prediction():
         "priority": "normal"
     }
     
-    response = client.post("/api/v1/predictions/batch", json=batch_request)
+    response = await post_json(client, "/api/v1/predictions/batch", batch_request)
     assert response.status_code == 200
     
-    data = response.json()
+    data = orjson.loads(response.content)
     assert "batch_id" in data
     assert data["status"] == "pending"
     assert data["total_records"] == 2
     assert data["processed_records"] == 0
     assert data["model_name"] == "xgboost"
 
-def test_get_batch_prediction():
+@pytest.mark.asyncio
+async def test_get_batch_prediction(client):
     """Test getting batch prediction status"""
     # Create batch first
     batch_request = {
         "predictions": [
             {
                 "patient_id": str(uuid.uuid4()),
-                "features": SAMPLE_PATIENT_FEATURES
+                "features": SAMPLE_FEATURES_JSON
             }
         ],
         "model_name": "xgboost"
     }
     
-    create_response = client.post("/api/v1/predictions/batch", json=batch_request)
+    create_response = await post_json(client, "/api/v1/predictions/batch", batch_request)
     assert create_response.status_code == 200
     
-    batch_id = create_response.json()["batch_id"]
+    batch_id = orjson.loads(create_response.content)["batch_id"]
     
     # Get batch status
-    status_response = client.get(f"/api/v1/predictions/batch/{batch_id}")
+    status_response = await client.get(f"/api/v1/predictions/batch/{batch_id}")
     assert status_response.status_code == 200
     
-    data = status_response.json()
+    data = orjson.loads(status_response.content)
     assert data["batch_id"] == batch_id
     assert data["status"] in ["pending", "processing", "completed", "failed"]
 
-def test_get_model_performance():
+@pytest.mark.asyncio
+async def test_get_model_performance(client):
     """Test getting model performance metrics"""
-    response = client.get("/api/v1/predictions/models/performance")
+    response = await client.get("/api/v1/predictions/models/performance")
     assert response.status_code == 200
     
-    data = response.json()
+    data = orjson.loads(response.content)
     assert "models" in data
     assert "comparison_date" in data
     assert "recommended_model" in data
@@ -269,12 +348,13 @@ def test_get_model_performance():
     assert "recall" in model
     assert "f1_score" in model
 
-def test_get_specific_model_performance():
+@pytest.mark.asyncio
+async def test_get_specific_model_performance(client):
     """Test getting performance for a specific model"""
-    response = client.get("/api/v1/predictions/models/performance?model_name=xgboost")
+    response = await client.get("/api/v1/predictions/models/performance?model_name=xgboost")
     assert response.status_code == 200
     
-    data = response.json()
+    data = orjson.loads(response.content)
     assert "models" in data
     assert len(data["models"]) == 1
     assert data["models"][0]["model_name"] == "xgboost"
@@ -283,18 +363,50 @@ def test_get_specific_model_performance():
 def test_patient_features_validation():
     """Test patient features validation"""
     # Test with valid features
-    valid_features = PatientFeatures(**SAMPLE_PATIENT_FEATURES)
+    valid_features = _sample_features()
     assert valid_features.age == 65
     assert valid_features.gender == "Male"
     
     # Test with invalid age
-    invalid_features = SAMPLE_PATIENT_FEATURES.copy()
-    invalid_features["age"] = 200
+    invalid_features = {**SAMPLE_PATIENT_FEATURES, "age": 200}
     
     with pytest.raises(Exception):  # Should raise validation error
         PatientFeatures(**invalid_features)
 
-def test_batch_prediction_validation():
+@pytest.mark.parametrize("recommendations", [RECOMMENDATIONS_BY_LEVEL[RiskLevel.HIGH], ["Follow up"]])
+def test_prediction_response_serializes_recommendations(recommendations):
+    """Test shared recommendation tuples and stored lists serialize cleanly"""
+    response = PredictionResponse(
+        prediction_id=uuid.uuid4(),
+        patient_id=uuid.uuid4(),
+        risk_score=0.75,
+        risk_level="High",
+        model_used="xgboost",
+        model_version="1.0.0",
+        recommendations=recommendations,
+        created_at=datetime.now()
+    )
+    
+    with warnings.catch_warnings():
+        warnings.simplefilter("error")
+        data = orjson.loads(response.model_dump_json())
+    assert data["recommendations"] == list(recommendations)
+
+@pytest.mark.asyncio
+async def test_encode_combination_medications():
+    """Test the dashed combination medication columns are encoded"""
+    ml_service = MLService()
+    await ml_service._initialize_feature_encoders()
+    
+    features = PatientFeatures(**{**SAMPLE_PATIENT_FEATURES, "glyburide-metformin": "Up"})
+    row = await ml_service._preprocess_features(features)
+    
+    column = ml_service._feature_index["glyburide-metformin"]
+    assert row[0, column] == ml_service.feature_encoder_maps["glyburide_metformin"]["Up"]
+    assert row[0, column] != 0
+
+@pytest.mark.asyncio
+async def test_batch_prediction_validation(client):
     """Test batch prediction validation"""
     # Test with empty predictions list
     batch_request = {
@@ -302,70 +414,62 @@ def test_batch_prediction_validation():
         "model_name": "xgboost"
     }
     
-    response = client.post("/api/v1/predictions/batch", json=batch_request)
+    response = await post_json(client, "/api/v1/predictions/batch", batch_request)
     assert response.status_code == 422  # Validation error
 
-def test_api_error_handling():
+@pytest.mark.asyncio
+async def test_api_error_handling(client):
     """Test API error handling"""
     # Test invalid endpoint
-    response = client.get("/api/v1/nonexistent")
+    response = await client.get("/api/v1/nonexistent")
     assert response.status_code == 404
     
     # Test invalid method
-    response = client.delete("/api/v1/predictions/")
+    response = await client.delete("/api/v1/predictions/")
     assert response.status_code == 405
 
 # Performance tests
-def test_prediction_performance():
+def test_prediction_performance(benchmark, client, event_loop):
     """Test prediction performance"""
-    import time
-    
     patient_id = str(uuid.uuid4())
-    prediction_request = {
+    body = orjson.dumps({
         "patient_id": patient_id,
-        "features": SAMPLE_PATIENT_FEATURES,
+        "features": SAMPLE_FEATURES_JSON,
         "model_name": "xgboost"
-    }
+    })
     
-    start_time = time.time()
-    response = client.post("/api/v1/predictions/", json=prediction_request)
-    end_time = time.time()
+    def make_prediction():
+        return event_loop.run_until_complete(
+            client.post("/api/v1/predictions/", content=body, headers=JSON_HEADERS)
+        )
+    
+    # Warm-up plus repeated rounds give a stable median instead of one sample
+    response = benchmark.pedantic(make_prediction, iterations=20, rounds=5, warmup_rounds=1)
     
     assert response.status_code == 200
-    assert (end_time - start_time) < 2.0  # Should complete within 2 seconds
+    # No stats are collected when benchmarking is disabled (e.g. under xdist)
+    if benchmark.stats is not None:
+        assert benchmark.stats["median"] < 0.5  # Median request under 500ms
 
-def test_concurrent_predictions():
+@pytest.mark.asyncio
+async def test_concurrent_predictions(client):
     """Test concurrent predictions"""
-    import threading
-    import time
-    
-    results = []
-    
-    def make_prediction():
+    async def make_prediction():
         patient_id = str(uuid.uuid4())
         prediction_request = {
             "patient_id": patient_id,
-            "features": SAMPLE_PATIENT_FEATURES,
+            "features": SAMPLE_FEATURES_JSON,
             "model_name": "xgboost"
         }
         
-        response = client.post("/api/v1/predictions/", json=prediction_request)
-        results.append(response.status_code)
-    
-    # Create multiple threads
-    threads = []
-    for i in range(5):
-        thread = threading.Thread(target=make_prediction)
-        threads.append(thread)
-        thread.start()
+        return await post_json(client, "/api/v1/predictions/", prediction_request)
     
-    # Wait for all threads to complete
-    for thread in threads:
-        thread.join()
+    # Run the requests concurrently on one event loop
+    responses = await asyncio.gather(*[make_prediction() for _ in range(5)])
     
     # Check all predictions succeeded
-    assert all(status == 200 for status in results)
-    assert len(results) == 5
+    assert all(response.status_code == 200 for response in responses)
+    assert len(responses) == 5
 
 if __name__ == "__main__":
     pytest.main([__file__])
\ No newline at end of file